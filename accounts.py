@@ -0,0 +1,318 @@
+"""
+Multi-account projections with array bucket state
+
+Each account (RRSP, TFSA, non-registered, ...) has its own balance, contribution
+schedule, returns, tax treatment and withdrawal priority. Balances are held as a
+(scenarios, accounts) array and advanced one month at a time for every scenario
+at once. Withdrawals drain accounts in priority order using array operations,
+and the lowest-priority account absorbs any shortfall (it may go negative).
+
+The original three-bucket model (payouts, then savings, then existing assets) is
+the special case built by legacy_accounts(), and calculate_bucket_projection() is
+a drop-in replacement for calculate_year_by_year_projection(). Per-month array
+overhead makes this slower than the scalar loop for a single plan; it pays off
+as the number of scenarios or accounts grows.
+"""
+from typing import Dict, List, Any, AbstractSet, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculations import PROJECTION_END_AGE, annual_rate_to_monthly, make_projection_row
+from models import RetirementInputs
+
+
+class Account:
+    """One account type and its rules"""
+
+    def __init__(
+        self,
+        name: str,
+        balance: float = 0.0,
+        monthly_contribution: float = 0.0,
+        contribution_start_age: Optional[int] = None,
+        contribution_end_age: Optional[int] = None,
+        annual_return: float = 0.0,
+        post_retirement_return: Optional[float] = None,
+        taxable_fraction: float = 1.0,
+        withdrawal_priority: int = 0,
+        deposits: Optional[List[Tuple[int, float]]] = None,
+    ):
+        self.name = name
+        self.balance = balance
+        self.monthly_contribution = monthly_contribution
+        self.contribution_start_age = contribution_start_age  # None: current age
+        self.contribution_end_age = contribution_end_age  # None: retirement age
+        self.annual_return = annual_return
+        self.post_retirement_return = annual_return if post_retirement_return is None else post_retirement_return
+        self.taxable_fraction = taxable_fraction  # 1.0 RRSP-like, 0.0 TFSA-like
+        self.withdrawal_priority = withdrawal_priority  # lower drains first
+        self.deposits = deposits or []  # one-time (age, amount) deposits
+
+
+def legacy_accounts(inputs: RetirementInputs, post_retirement_cagr: float) -> List[Account]:
+    """The payouts / savings / existing-assets buckets used by calculate_year_by_year_projection."""
+    return [
+        Account(
+            'payouts',
+            annual_return=inputs.cagr,
+            post_retirement_return=post_retirement_cagr,
+            withdrawal_priority=0,
+            deposits=[(int(payout['year']), float(payout['amount'])) for payout in inputs.payouts],
+        ),
+        Account(
+            'savings_contributions',
+            monthly_contribution=inputs.monthly_savings if inputs.monthly_savings > 0 else 0.0,
+            annual_return=inputs.cagr,
+            post_retirement_return=post_retirement_cagr,
+            withdrawal_priority=1,
+        ),
+        Account(
+            'current_assets',
+            balance=inputs.current_asset_values,
+            annual_return=inputs.cagr,
+            post_retirement_return=post_retirement_cagr,
+            withdrawal_priority=2,
+        ),
+    ]
+
+
+def withdrawal_cost(taxable_fraction: float, tax_rate: float) -> float:
+    """
+    Gross dollars taken from an account per dollar of pre-tax withdrawal target.
+
+    The target is grossed up at tax_rate assuming fully taxable income, so
+    accounts with a lower taxable fraction need fewer gross dollars.
+    """
+    denominator = 1 - tax_rate * taxable_fraction
+    if taxable_fraction == 1 or denominator <= 0:
+        return 1.0
+    return (1 - tax_rate) / denominator
+
+
+def simulate_buckets(
+    balances: np.ndarray,
+    monthly_contributions: np.ndarray,
+    contribution_start_months: np.ndarray,
+    contribution_end_months: np.ndarray,
+    pre_retirement_rates: np.ndarray,
+    post_retirement_rates: np.ndarray,
+    withdrawal_costs: np.ndarray,
+    monthly_withdrawals: np.ndarray,
+    retirement_months: np.ndarray,
+    horizon_months: np.ndarray,
+    deposits: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    record_years: bool = True,
+) -> Dict[str, Any]:
+    """
+    Advance S scenarios of N accounts month by month.
+
+    Per-account arrays are (S, N) with columns in withdrawal-priority order;
+    per-scenario arrays are (S,). deposits maps a month to (scenario indices,
+    account indices, amounts) with unique index pairs. Each month applies
+    deposits, then contributions (within their schedule) or withdrawals (after
+    retirement), then growth, matching the scalar loop.
+
+    Internally balances are stored account-major and scenarios are sorted
+    longest horizon first, so each month works on contiguous rows and only on
+    the scenarios still running. Results are returned in input order.
+    """
+    horizon_months = np.asarray(horizon_months)
+    order = np.argsort(-horizon_months, kind='stable')
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+
+    def by_horizon(values) -> np.ndarray:
+        return np.asarray(values)[order]
+
+    def accounts_by_horizon(values) -> np.ndarray:
+        return np.ascontiguousarray(np.asarray(values, dtype=float)[order].T)
+
+    balances = accounts_by_horizon(balances)
+    monthly_contributions = accounts_by_horizon(monthly_contributions)
+    contribution_start_months = accounts_by_horizon(contribution_start_months)
+    contribution_end_months = accounts_by_horizon(contribution_end_months)
+    withdrawal_costs = accounts_by_horizon(withdrawal_costs)
+    pre_growth = 1 + accounts_by_horizon(pre_retirement_rates)
+    post_growth = 1 + accounts_by_horizon(post_retirement_rates)
+    monthly_withdrawals = by_horizon(monthly_withdrawals)
+    retirement_months = by_horizon(retirement_months)
+    horizon_months = horizon_months[order]
+
+    account_count, scenario_count = balances.shape
+    max_months = int(horizon_months[0]) if scenario_count else 0
+    # Scenarios still running in each month form a prefix of the sorted arrays.
+    running_counts = np.searchsorted(-horizon_months, -np.arange(max_months + 1), side='right')
+
+    depleted = np.zeros(scenario_count, dtype=bool)
+    depletion_months = np.full(scenario_count, np.nan)
+    retirement_balances = np.full((account_count, scenario_count), np.nan)
+    end_balances = np.full((account_count, scenario_count), np.nan)
+    at_start = retirement_months == 0
+    retirement_balances[:, at_start] = balances[:, at_start]
+    at_start = horizon_months == 0
+    end_balances[:, at_start] = balances[:, at_start]
+
+    year_end_balances = None
+    if record_years:
+        year_end_balances = np.empty((max_months // 12 + 1, account_count, scenario_count))
+        year_end_balances[0] = balances
+
+    for month in range(1, max_months + 1):
+        running = running_counts[month]
+        current = balances[:, :running]
+        if month in deposits:
+            scenario_index, account_index, amounts = deposits[month]
+            balances[account_index, position[scenario_index]] += amounts
+
+        contributing = (
+            (month > contribution_start_months[:, :running])
+            & (month <= contribution_end_months[:, :running])
+        )
+        np.add(current, monthly_contributions[:, :running], out=current, where=contributing)
+
+        pre_retirement = month <= retirement_months[:running]
+        if not pre_retirement.all():
+            # Drain accounts in priority order; the last one absorbs any shortfall.
+            # Pre-retirement scenarios have a zero target, so nothing is taken from them.
+            remaining = np.where(pre_retirement, 0.0, monthly_withdrawals[:running])
+            for column in range(account_count):
+                costs = withdrawal_costs[column, :running]
+                if column == account_count - 1:
+                    current[column] -= np.maximum(remaining, 0.0) * costs
+                    break
+                capacity = current[column] / costs
+                current[column] -= np.minimum(np.maximum(remaining, 0.0), capacity) * costs
+                remaining = remaining - capacity
+
+        current *= np.where(pre_retirement, pre_growth[:, :running], post_growth[:, :running])
+
+        total = current[-1]
+        for column in range(account_count - 2, -1, -1):
+            total = total + current[column]
+        newly_depleted = (total < 0) & ~depleted[:running]
+        if newly_depleted.any():
+            depleted[:running] |= newly_depleted
+            depletion_months[:running][newly_depleted] = month
+
+        if month % 12 == 0:
+            if record_years:
+                year_end_balances[month // 12] = balances
+            reached = np.flatnonzero(retirement_months[:running] == month)
+            retirement_balances[:, reached] = current[:, reached]
+            reached = np.flatnonzero(horizon_months[:running] == month)
+            end_balances[:, reached] = current[:, reached]
+
+    return {
+        'year_end_balances': (
+            year_end_balances[:, :, position].transpose(2, 0, 1) if record_years else None
+        ),
+        'retirement_balances': retirement_balances[:, position].T,
+        'end_balances': end_balances[:, position].T,
+        'depletion_months': depletion_months[position],
+    }
+
+
+def project_accounts(
+    accounts: Sequence[Account],
+    current_age: int,
+    retirement_age: int,
+    monthly_withdrawal: float,
+    tax_rate: float = 0.0,
+    record_years: bool = True,
+) -> Dict[str, Any]:
+    """
+    Project one household's accounts from current_age to PROJECTION_END_AGE.
+
+    monthly_withdrawal is the pre-tax target (grossed up at tax_rate); accounts
+    are drained lowest withdrawal_priority first.
+    """
+    ordered = sorted(accounts, key=lambda account: account.withdrawal_priority)
+    horizon_months = max(0, (PROJECTION_END_AGE - current_age) * 12)
+    retirement_months = (retirement_age - current_age) * 12
+
+    def months_from_start(age: Optional[int], default: int) -> int:
+        return default if age is None else (age - current_age) * 12
+
+    # Same-month deposits are summed first, in the order the scalar loop adds them.
+    deposit_totals: Dict[int, Dict[int, float]] = {}
+    for column, account in enumerate(ordered):
+        for age, amount in account.deposits:
+            if age > PROJECTION_END_AGE:
+                continue
+            month = (age - current_age) * 12
+            if 0 <= month <= horizon_months:
+                month_totals = deposit_totals.setdefault(month, {})
+                month_totals[column] = month_totals.get(column, 0.0) + amount
+    deposits = {
+        month: (np.zeros(len(totals), dtype=int), np.array(list(totals)), np.array(list(totals.values())))
+        for month, totals in deposit_totals.items()
+    }
+
+    def row(values: Sequence[float]) -> np.ndarray:
+        return np.array([values], dtype=float)
+
+    results = simulate_buckets(
+        balances=row([account.balance for account in ordered]),
+        monthly_contributions=row([account.monthly_contribution for account in ordered]),
+        contribution_start_months=row([months_from_start(a.contribution_start_age, 0) for a in ordered]),
+        contribution_end_months=row([months_from_start(a.contribution_end_age, retirement_months) for a in ordered]),
+        pre_retirement_rates=row([annual_rate_to_monthly(account.annual_return) for account in ordered]),
+        post_retirement_rates=row([annual_rate_to_monthly(account.post_retirement_return) for account in ordered]),
+        withdrawal_costs=row([withdrawal_cost(account.taxable_fraction, tax_rate) for account in ordered]),
+        monthly_withdrawals=np.array([monthly_withdrawal], dtype=float),
+        retirement_months=np.array([retirement_months]),
+        horizon_months=np.array([horizon_months]),
+        deposits=deposits,
+        record_years=record_years,
+    )
+
+    depletion_month = results['depletion_months'][0]
+    retirement_balances = results['retirement_balances'][0]
+    return {
+        'accounts': [account.name for account in ordered],
+        'ages': list(range(current_age, current_age + horizon_months // 12 + 1)),
+        'balances': results['year_end_balances'][0] if record_years else None,
+        'retirement_balances': None if np.isnan(retirement_balances).any() else retirement_balances,
+        'end_balances': results['end_balances'][0],
+        'depletion_age': None if np.isnan(depletion_month) else current_age + float(depletion_month) / 12,
+    }
+
+
+def calculate_bucket_projection(
+    inputs: RetirementInputs,
+    target_net_worth: float,
+    monthly_retirement_withdrawal: float,
+    post_retirement_cagr: float,
+    include_ages: Optional[AbstractSet[int]] = None,
+    year_end_balances: Optional[List[Tuple[float, float, float]]] = None,
+) -> Dict[str, Any]:
+    """Array-engine equivalent of calculate_year_by_year_projection."""
+    projection = project_accounts(
+        legacy_accounts(inputs, post_retirement_cagr),
+        inputs.current_age,
+        inputs.ideal_retirement_age,
+        monthly_retirement_withdrawal,
+    )
+
+    def snapshot(age: int, balances: Sequence[float]) -> Dict[str, Any]:
+        payouts_value, savings, current_assets = (float(value) for value in balances)
+        return make_projection_row(age, current_assets, savings, payouts_value, target_net_worth)
+
+    ages = projection['ages']
+    projections = [
+        snapshot(age, balances)
+        for age, balances in zip(ages, projection['balances'])
+        if include_ages is None or age in include_ages
+    ]
+    if year_end_balances is not None:
+        year_end_balances.extend(tuple(balances) for balances in projection['balances'][:, ::-1].tolist())
+    retirement_balances = projection['retirement_balances']
+    return {
+        'projections': projections,
+        'retirement_snapshot': (
+            snapshot(inputs.ideal_retirement_age, retirement_balances)
+            if retirement_balances is not None else None
+        ),
+        'projection_end_snapshot': snapshot(ages[-1], projection['end_balances']),
+        'depletion_age': projection['depletion_age'],
+    }
@@ -0,0 +1,79 @@
+"""
+Shared monthly-rate and annuity factors for the closed-form helpers
+
+The target, sustainable-withdrawal, savings and shortfall formulas all need the
+same monthly rate and (1 + r) ** n powers for a given (annual rate, months)
+pair. factors_for() computes them once and keeps them in a bounded LRU cache, so
+batch and solver workloads repeating the same rates and horizons skip the
+fractional powers. factor_arrays() is the NumPy equivalent for grids.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+MIN_ANNUAL_RATE = -0.999999
+FACTOR_CACHE_SIZE = 4096
+# Below this the annuity formulas divide by ~0; callers use the linear limit instead.
+ZERO_RATE_TOLERANCE = 1e-12
+
+
+class AnnuityFactors(NamedTuple):
+    """Factors for one (annual rate, months) pair"""
+
+    monthly_rate: float
+    growth_factor: float  # (1 + r) ** months
+    annuity_factor: float  # ((1 + r) ** months - 1) / r, or months when r ~ 0
+    annuity_due_factor: float  # annuity_factor * (1 + r)
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def monthly_rate(annual_rate: float) -> float:
+    """Convert annual growth rate to monthly rate with a safe lower bound."""
+    safe_annual_rate = max(annual_rate, MIN_ANNUAL_RATE)
+    return (1 + safe_annual_rate) ** (1 / 12) - 1
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def factors_for(annual_rate: float, months: int) -> AnnuityFactors:
+    """Monthly rate, growth factor and annuity factors for annual_rate over months."""
+    rate = monthly_rate(annual_rate)
+    growth_factor = (1 + rate) ** months
+    if abs(rate) < ZERO_RATE_TOLERANCE:
+        annuity_factor = float(months)
+        return AnnuityFactors(rate, growth_factor, annuity_factor, annuity_factor)
+
+    annuity_factor = (growth_factor - 1) / rate
+    return AnnuityFactors(rate, growth_factor, annuity_factor, annuity_factor * (1 + rate))
+
+
+def factor_arrays(annual_rates, months) -> AnnuityFactors:
+    """
+    Element-wise factors for arrays of annual rates and months (broadcast together).
+
+    Returns an AnnuityFactors of float arrays. Results can differ from
+    factors_for() in the last bit, since NumPy's pow is not Python's.
+    """
+    annual_rates = np.asarray(annual_rates, dtype=float)
+    months = np.asarray(months, dtype=float)
+    rates = (1 + np.maximum(annual_rates, MIN_ANNUAL_RATE)) ** (1 / 12) - 1
+    growth_factors = (1 + rates) ** months
+
+    near_zero = np.abs(rates) < ZERO_RATE_TOLERANCE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ordinary = np.where(near_zero, months, (growth_factors - 1) / np.where(near_zero, 1.0, rates))
+    due = np.where(near_zero, ordinary, ordinary * (1 + rates))
+
+    shape = np.broadcast(rates, growth_factors).shape
+    return AnnuityFactors(
+        np.broadcast_to(rates, shape),
+        growth_factors,
+        np.broadcast_to(ordinary, shape),
+        np.broadcast_to(due, shape),
+    )
+
+
+def clear_cache() -> None:
+    """Drop all cached factors (e.g. between benchmark runs)."""
+    monthly_rate.cache_clear()
+    factors_for.cache_clear()
@@ -2,12 +2,18 @@ import json
 import os
 import re
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from openai import OpenAI
-from calculations import calculate_retirement_plan
 from models import validate_inputs, RetirementInputs
+from plan_store import PlanStore
+from currency import convert_plan, inputs_to_base_currency, parse_display_currency
+from projection_output import ProjectionOptions, shape_plan
+from profiling import note_cache_hit, profiled
+import batch
+from live_recalc import LiveRecalcHub, SESSION_ID_PATTERN
 
 app = Flask(__name__)
+live_hub = LiveRecalcHub()
 
 try:
     from dotenv import load_dotenv
@@ -18,6 +24,19 @@ if load_dotenv:
     load_dotenv()
 
 OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-5.2')
+app.config.setdefault(
+    'PLAN_STORE_PATH',
+    os.environ.get('PLAN_STORE_PATH') or os.path.join(app.instance_path, 'plans.sqlite3'),
+)
+app.config.setdefault(
+    'PROFILING_ENABLED',
+    os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes'),
+)
+app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.environ.get('PROFILE_SAMPLE_RATE') or 0))
+app.config.setdefault(
+    'PROFILE_DIR',
+    os.environ.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles'),
+)
 
 
 def normalize_chat_response(text):
@@ -51,13 +70,26 @@ def normalize_chat_response(text):
     return '\n'.join(cleaned_lines).strip()
 
 def get_openai_client():
-    """Create an OpenAI client if the API key is configured."""
+    """
+    Create an OpenAI client if the API key is configured.
+
+    OPENAI_BASE_URL points the client at another OpenAI-compatible server,
+    such as stub_llm.py for load tests.
+    """
     api_key = os.environ.get('OPENAI_API_KEY')
     if not api_key:
         raise RuntimeError(
             'OpenAI API key is not configured. Set the OPENAI_API_KEY environment variable.'
         )
-    return OpenAI(api_key=api_key)
+    return OpenAI(api_key=api_key, base_url=os.environ.get('OPENAI_BASE_URL') or None)
+
+def get_plan_store():
+    """Return the plan store for the configured path, opening it on first use."""
+    store = app.extensions.get('plan_store')
+    if store is None or store.path != app.config['PLAN_STORE_PATH']:
+        store = PlanStore(app.config['PLAN_STORE_PATH'])
+        app.extensions['plan_store'] = store
+    return store
 
 @app.route('/')
 def index():
@@ -75,6 +107,7 @@ def dashboard():
     return render_template('dashboard.html')
 
 @app.route('/api/calculate', methods=['POST'])
+@profiled
 def calculate():
     """API endpoint to calculate retirement plan"""
     try:
@@ -86,25 +119,124 @@ def calculate():
             error_message = '; '.join(errors) if isinstance(errors, list) else str(errors)
             return jsonify({'error': error_message}), 400
         
-        # Create input model
-        inputs = RetirementInputs.from_dict(data)
+        try:
+            currency_code, currency_rate = parse_display_currency(data)
+            options = ProjectionOptions.from_request(data)
+        except ValueError as err:
+            return jsonify({'error': str(err)}), 400
+        
+        # Create input model (amounts arrive in the display currency; tax brackets are in CAD)
+        inputs = RetirementInputs.from_dict(inputs_to_base_currency(data, currency_rate))
         
-        # Calculate retirement plan
-        result = calculate_retirement_plan(inputs)
+        # Calculate retirement plan (or reuse the stored result for identical inputs)
+        result = shape_plan(get_plan_store().get_or_calculate(inputs, options, note_cache_hit), options)
         
-        return jsonify(result)
+        return jsonify(convert_plan(result, currency_code, currency_rate))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """Stream results for many scenarios as NDJSON (default) or a chunked JSON array."""
+    is_ndjson_body = request.mimetype == 'application/x-ndjson'
+    # Scenario lines in an NDJSON body are read lazily, so options come from the query string.
+    data = request.args if is_ndjson_body else (request.get_json(silent=True) or {})
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in ('ndjson', 'json'):
+        return jsonify({'error': 'Format must be ndjson or json.'}), 400
+
+    try:
+        currency = parse_display_currency(data)
+        options = ProjectionOptions.from_request(data)
+        if is_ndjson_body:
+            scenarios = batch.iter_ndjson_scenarios(request.stream)
+        else:
+            scenarios = batch.iter_scenarios(data)
+    except ValueError as err:
+        return jsonify({'error': str(err)}), 400
+
+    results = batch.iter_results(scenarios, options, currency)
+    if output_format == 'json':
+        return Response(stream_with_context(batch.to_json_array(results)), mimetype='application/json')
+    return Response(stream_with_context(batch.to_ndjson(results)), mimetype='application/x-ndjson')
+
+@app.route('/api/plans/<plan_id>', methods=['GET'])
+def get_plan(plan_id):
+    """Fetch a previously calculated plan by ID, optionally in a display currency."""
+    try:
+        currency_code, currency_rate = parse_display_currency(request.args)
+        options = ProjectionOptions.from_request(request.args)
+    except ValueError as err:
+        return jsonify({'error': str(err)}), 400
+
+    plan = get_plan_store().get(plan_id, options)
+    if plan is None:
+        return jsonify({'error': 'Plan not found.'}), 404
+    return jsonify(convert_plan(shape_plan(plan, options), currency_code, currency_rate))
+
+@app.route('/api/live/<session_id>/inputs', methods=['POST'])
+def live_inputs(session_id):
+    """Queue inputs for a live recalculation session."""
+    if not SESSION_ID_PATTERN.match(session_id):
+        return jsonify({'error': 'Invalid session ID.'}), 400
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object.'}), 400
+    inputs_data = data.get('inputs')
+    if not isinstance(inputs_data, dict):
+        return jsonify({'error': 'inputs must be a JSON object.'}), 400
+    errors = validate_inputs(inputs_data)
+    if errors:
+        return jsonify({'error': '; '.join(errors)}), 400
+
+    try:
+        seq = int(data.get('seq'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'A numeric seq is required.'}), 400
+
+    try:
+        currency_code, currency_rate = parse_display_currency(data)
+    except ValueError as err:
+        return jsonify({'error': str(err)}), 400
+
+    inputs = RetirementInputs.from_dict(inputs_to_base_currency(inputs_data, currency_rate))
+    accepted = live_hub.submit(session_id, seq, inputs, (currency_code, currency_rate))
+    return jsonify({'accepted': accepted, 'seq': seq}), 202
+
+@app.route('/api/live/<session_id>/events', methods=['GET'])
+def live_events(session_id):
+    """Server-Sent Events stream of plan diffs for a live session."""
+    if not SESSION_ID_PATTERN.match(session_id):
+        return jsonify({'error': 'Invalid session ID.'}), 400
+
+    return Response(
+        stream_with_context(live_hub.events(session_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 @app.route('/api/chat', methods=['POST'])
+@profiled
 def chat():
     """Use OpenAI to answer plan-related questions."""
     data = request.json or {}
     message = (data.get('message') or '').strip()
+    plan_id = data.get('plan_id')
     plan_data = data.get('plan_data') or {}
     
     if not message:
         return jsonify({'error': 'A message is required.'}), 400
+
+    if plan_id:
+        try:
+            currency_code, currency_rate = parse_display_currency(data)
+        except ValueError as err:
+            return jsonify({'error': str(err)}), 400
+        plan_data = get_plan_store().get(str(plan_id))
+        if plan_data is None:
+            return jsonify({'error': 'Plan not found.'}), 404
+        plan_data = convert_plan(plan_data, currency_code, currency_rate)
     
     try:
         client = get_openai_client()
@@ -161,4 +293,4 @@ def chat_health():
         return jsonify({'ok': False, 'error': 'Chat health check failed.'}), 500
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    app.run(debug=True, port=5001, threaded=True)
@@ -0,0 +1,110 @@
+"""
+Streaming multi-scenario calculations
+
+Scenarios are read lazily (from a list, a cartesian grid over a base plan, or an
+NDJSON request body), calculated one at a time, and serialized as they finish, so
+memory use does not grow with the number of scenarios in a request.
+"""
+import itertools
+import json
+from typing import Dict, Any, Iterable, Iterator, Tuple
+
+from calculations import calculate_retirement_plan
+from currency import convert_plan, inputs_to_base_currency
+from models import RetirementInputs, validate_inputs
+from projection_output import ProjectionOptions, shape_plan
+
+MAX_BATCH_SCENARIOS = 10000
+
+
+def iter_scenarios(data: Dict[str, Any], limit: int = MAX_BATCH_SCENARIOS) -> Iterator[Dict[str, Any]]:
+    """
+    Scenario payloads from `scenarios` (a list) or `base` plus `grid`.
+
+    A grid maps input fields to lists of values; every combination is applied
+    on top of `base`, generated lazily in row-major order. The request shape is
+    checked here, before any streaming starts.
+    """
+    if 'scenarios' in data:
+        scenarios = data['scenarios']
+        if not isinstance(scenarios, list):
+            raise ValueError('Scenarios must be a list')
+        return iter(scenarios)
+
+    base = data.get('base')
+    grid = data.get('grid') or {}
+    if not isinstance(base, dict):
+        raise ValueError('Provide either scenarios or a base plan')
+    if not isinstance(grid, dict) or not all(isinstance(values, list) and values for values in grid.values()):
+        raise ValueError('Grid must map field names to non-empty lists')
+
+    combinations = 1
+    for values in grid.values():
+        combinations *= len(values)
+    if combinations > limit:
+        raise ValueError(f'Batch is limited to {limit} scenarios')
+
+    fields = list(grid)
+    return (
+        {**base, **dict(zip(fields, combination))}
+        for combination in itertools.product(*(grid[field] for field in fields))
+    )
+
+
+def iter_ndjson_scenarios(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield one scenario per non-blank line of an NDJSON body (None for unparseable lines)."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_results(
+    scenarios: Iterable[Dict[str, Any]],
+    options: ProjectionOptions,
+    currency: Tuple[str, float],
+    limit: int = MAX_BATCH_SCENARIOS,
+) -> Iterator[Dict[str, Any]]:
+    """Calculate each scenario in turn, yielding {'index', 'result'} or {'index', 'error'}."""
+    currency_code, currency_rate = currency
+    for index, scenario in enumerate(scenarios):
+        if index >= limit:
+            yield {'index': index, 'error': f'Batch is limited to {limit} scenarios'}
+            return
+
+        if not isinstance(scenario, dict):
+            yield {'index': index, 'error': 'Scenario must be an object'}
+            continue
+        errors = validate_inputs(scenario)
+        if errors:
+            yield {'index': index, 'error': '; '.join(errors)}
+            continue
+
+        try:
+            inputs = RetirementInputs.from_dict(inputs_to_base_currency(scenario, currency_rate))
+            include_ages = options.include_ages(inputs.current_age, inputs.ideal_retirement_age)
+            result = shape_plan(calculate_retirement_plan(inputs, include_ages), options)
+            result = convert_plan(result, currency_code, currency_rate)
+        except Exception as exc:
+            # One failing scenario must not end the stream for the rest.
+            yield {'index': index, 'error': str(exc)}
+            continue
+        yield {'index': index, 'result': result}
+
+
+def to_ndjson(results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """One compact JSON document per line."""
+    for item in results:
+        yield json.dumps(item, separators=(',', ':')) + '\n'
+
+
+def to_json_array(results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """A single JSON array, emitted one element at a time."""
+    yield '['
+    for position, item in enumerate(results):
+        yield (',' if position else '') + json.dumps(item, separators=(',', ':'))
+    yield ']\n'
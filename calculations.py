@@ -1,8 +1,11 @@
 """
 Core financial calculations for retirement planning
 """
-from typing import Dict, List, Any
+from typing import AbstractSet, Callable, Dict, List, Any, Optional, Tuple
 
+import numpy as np
+
+from annuity_factors import factor_arrays, factors_for, monthly_rate
 from models import RetirementInputs
 from tax_calculator import (
     calculate_after_tax_income,
@@ -15,8 +18,7 @@ PROJECTION_END_AGE = 100
 
 def annual_rate_to_monthly(annual_rate: float) -> float:
     """Convert annual growth rate to monthly rate with a safe lower bound."""
-    safe_annual_rate = max(annual_rate, -0.999999)
-    return (1 + safe_annual_rate) ** (1 / 12) - 1
+    return monthly_rate(annual_rate)
 
 
 def calculate_required_retirement_balance(
@@ -33,12 +35,12 @@ def calculate_required_retirement_balance(
     if monthly_pre_tax_withdrawal <= 0 or months_in_retirement <= 0:
         return 0.0
 
-    monthly_rate = annual_rate_to_monthly(annual_post_retirement_return)
-    if abs(monthly_rate) < 1e-12:
+    factors = factors_for(annual_post_retirement_return, months_in_retirement)
+    if abs(factors.monthly_rate) < 1e-12:
         return monthly_pre_tax_withdrawal * months_in_retirement
 
-    growth_factor = (1 + monthly_rate) ** months_in_retirement
-    annuity_due_factor = ((growth_factor - 1) / monthly_rate) * (1 + monthly_rate)
+    growth_factor = factors.growth_factor
+    annuity_due_factor = factors.annuity_due_factor
     if abs(annuity_due_factor) < 1e-12 or abs(growth_factor) < 1e-12:
         return monthly_pre_tax_withdrawal * months_in_retirement
 
@@ -54,18 +56,56 @@ def calculate_sustainable_monthly_withdrawal(
     if starting_balance <= 0 or months_in_retirement <= 0:
         return 0.0
 
-    monthly_rate = annual_rate_to_monthly(annual_post_retirement_return)
-    if abs(monthly_rate) < 1e-12:
+    factors = factors_for(annual_post_retirement_return, months_in_retirement)
+    if abs(factors.monthly_rate) < 1e-12:
         return starting_balance / months_in_retirement
 
-    growth_factor = (1 + monthly_rate) ** months_in_retirement
-    annuity_due_factor = ((growth_factor - 1) / monthly_rate) * (1 + monthly_rate)
+    growth_factor = factors.growth_factor
+    annuity_due_factor = factors.annuity_due_factor
     if abs(annuity_due_factor) < 1e-12:
         return 0.0
 
     return starting_balance * growth_factor / annuity_due_factor
 
 
+def calculate_required_retirement_balance_array(
+    monthly_pre_tax_withdrawals,
+    annual_post_retirement_returns,
+    months_in_retirement,
+) -> np.ndarray:
+    """Element-wise calculate_required_retirement_balance."""
+    withdrawals = np.asarray(monthly_pre_tax_withdrawals, dtype=float)
+    months = np.asarray(months_in_retirement)
+    factors = factor_arrays(annual_post_retirement_returns, months)
+    linear = withdrawals * months
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        balances = withdrawals * factors.annuity_due_factor / factors.growth_factor
+    degenerate = (
+        (np.abs(factors.monthly_rate) < 1e-12)
+        | (np.abs(factors.annuity_due_factor) < 1e-12)
+        | (np.abs(factors.growth_factor) < 1e-12)
+    )
+    balances = np.where(degenerate, linear, balances)
+    return np.where((withdrawals <= 0) | (months <= 0), 0.0, balances)
+
+
+def calculate_sustainable_monthly_withdrawal_array(
+    starting_balances,
+    annual_post_retirement_returns,
+    months_in_retirement,
+) -> np.ndarray:
+    """Element-wise calculate_sustainable_monthly_withdrawal."""
+    balances = np.asarray(starting_balances, dtype=float)
+    months = np.asarray(months_in_retirement)
+    factors = factor_arrays(annual_post_retirement_returns, months)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        linear = balances / months
+        withdrawals = balances * factors.growth_factor / factors.annuity_due_factor
+    withdrawals = np.where(np.abs(factors.annuity_due_factor) < 1e-12, 0.0, withdrawals)
+    withdrawals = np.where(np.abs(factors.monthly_rate) < 1e-12, linear, withdrawals)
+    return np.where((balances <= 0) | (months <= 0), 0.0, withdrawals)
+
+
 def calculate_target_net_worth(
     monthly_pre_tax_withdrawal: float,
     annual_post_retirement_return: float,
@@ -87,8 +127,7 @@ def project_current_assets(
     months_until_retirement: int
 ) -> float:
     """Project current assets forward with monthly compounding."""
-    monthly_rate = annual_rate_to_monthly(cagr)
-    return current_assets * (1 + monthly_rate) ** months_until_retirement
+    return current_assets * factors_for(cagr, months_until_retirement).growth_factor
 
 
 def project_monthly_savings(
@@ -100,14 +139,13 @@ def project_monthly_savings(
     if monthly_savings <= 0 or months_until_retirement <= 0:
         return 0.0
 
-    monthly_rate = annual_rate_to_monthly(cagr)
+    factors = factors_for(cagr, months_until_retirement)
 
     # Future value of annuity due (contribution then growth in same month)
-    if abs(monthly_rate) < 1e-12:
+    if abs(factors.monthly_rate) < 1e-12:
         return monthly_savings * months_until_retirement
 
-    annuity_factor = ((1 + monthly_rate) ** months_until_retirement - 1) / monthly_rate
-    return monthly_savings * annuity_factor * (1 + monthly_rate)
+    return monthly_savings * factors.annuity_factor * (1 + factors.monthly_rate)
 
 
 def project_payouts(
@@ -118,7 +156,6 @@ def project_payouts(
 ) -> float:
     """Project one-time payouts forward to retirement age."""
     total = 0.0
-    monthly_rate = annual_rate_to_monthly(cagr)
 
     for payout in payouts:
         amount = float(payout['amount'])
@@ -128,24 +165,52 @@ def project_payouts(
         months_until_retirement = years_until_retirement * 12
 
         if months_until_retirement > 0:
-            total += amount * (1 + monthly_rate) ** months_until_retirement
+            total += amount * factors_for(cagr, months_until_retirement).growth_factor
         elif months_until_retirement == 0:
             total += amount
 
     return total
 
 
+def make_projection_row(
+    age: int,
+    current_assets: float,
+    savings_contributions: float,
+    payouts_value: float,
+    target_net_worth: float,
+) -> Dict[str, Any]:
+    """Build one year_by_year entry from the three bucket balances."""
+    total_net_worth = current_assets + savings_contributions + payouts_value
+    return {
+        'year': age,
+        'age': age,
+        'current_assets': current_assets,
+        'savings_contributions': savings_contributions,
+        'payouts_value': payouts_value,
+        'total_net_worth': total_net_worth,
+        'target_net_worth': target_net_worth,
+        'gap': total_net_worth - target_net_worth,
+    }
+
+
 def calculate_year_by_year_projection(
     inputs: RetirementInputs,
     target_net_worth: float,
     monthly_retirement_withdrawal: float,
     post_retirement_cagr: float,
+    include_ages: Optional[AbstractSet[int]] = None,
+    year_end_balances: Optional[List[Tuple[float, float, float]]] = None,
 ) -> Dict[str, Any]:
     """
     Run one monthly simulation from current age to PROJECTION_END_AGE.
 
     Pre-retirement growth uses input CAGR.
     Post-retirement growth uses post_retirement_cagr (conservative cap).
+
+    When include_ages is given, only those ages are kept in 'projections';
+    the retirement and projection-end snapshots are always returned. When a
+    year_end_balances list is given, (current_assets, savings_contributions,
+    payouts_value) is appended to it for every age without building rows.
     """
     years_until_retirement = inputs.ideal_retirement_age - inputs.current_age
     months_until_retirement = years_until_retirement * 12
@@ -170,21 +235,35 @@ def calculate_year_by_year_projection(
         if 0 <= months_from_start <= months_until_projection_end:
             payout_schedule[months_from_start] = payout_schedule.get(months_from_start, 0.0) + amount
 
-    def append_projection(age: int) -> None:
-        total_net_worth = existing_assets_value + contribution_value + payout_value
-        projections.append({
-            'year': age,
-            'age': age,
-            'current_assets': existing_assets_value,
-            'savings_contributions': contribution_value,
-            'payouts_value': payout_value,
-            'total_net_worth': total_net_worth,
-            'target_net_worth': target_net_worth,
-            'gap': total_net_worth - target_net_worth,
-        })
-
-    append_projection(inputs.current_age)
-    retirement_snapshot = projections[0] if inputs.current_age == inputs.ideal_retirement_age else None
+    retirement_snapshot = None
+    projection_end_snapshot = None
+    end_age = inputs.current_age + months_until_projection_end // 12
+
+    def record_projection(age: int) -> None:
+        nonlocal retirement_snapshot, projection_end_snapshot
+        if year_end_balances is not None:
+            year_end_balances.append((existing_assets_value, contribution_value, payout_value))
+        keep = include_ages is None or age in include_ages
+        is_retirement = age == inputs.ideal_retirement_age
+        is_end = age == end_age
+        if not (keep or is_retirement or is_end):
+            return
+
+        row = make_projection_row(
+            age,
+            existing_assets_value,
+            contribution_value,
+            payout_value,
+            target_net_worth,
+        )
+        if keep:
+            projections.append(row)
+        if is_retirement:
+            retirement_snapshot = row
+        if is_end:
+            projection_end_snapshot = row
+
+    record_projection(inputs.current_age)
 
     for month in range(1, months_until_projection_end + 1):
         if month in payout_schedule:
@@ -225,21 +304,29 @@ def calculate_year_by_year_projection(
                 depletion_age = inputs.current_age + (month / 12)
 
         if month % 12 == 0:
-            age = inputs.current_age + (month // 12)
-            append_projection(age)
-            if age == inputs.ideal_retirement_age:
-                retirement_snapshot = projections[-1]
+            record_projection(inputs.current_age + (month // 12))
 
     return {
         'projections': projections,
         'retirement_snapshot': retirement_snapshot,
-        'projection_end_snapshot': projections[-1] if projections else None,
+        'projection_end_snapshot': projection_end_snapshot,
         'depletion_age': depletion_age,
     }
 
 
-def calculate_retirement_plan(inputs: RetirementInputs) -> Dict[str, Any]:
-    """Main function to calculate complete retirement plan."""
+def calculate_retirement_plan(
+    inputs: RetirementInputs,
+    include_ages: Optional[AbstractSet[int]] = None,
+    projection: Optional[Callable[..., Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Main function to calculate complete retirement plan.
+
+    include_ages limits which ages appear in 'year_by_year' (None keeps every
+    year, an empty set skips per-year rows); the KPIs are unaffected.
+    projection replaces calculate_year_by_year_projection (same signature),
+    e.g. with accounts.calculate_bucket_projection.
+    """
     annual_after_tax_income = inputs.ideal_retirement_income * 12
     pre_tax_retirement_income = calculate_pre_tax_income_needed(annual_after_tax_income)
 
@@ -257,15 +344,17 @@ def calculate_retirement_plan(inputs: RetirementInputs) -> Dict[str, Any]:
         months_in_retirement,
     )
 
-    projection_results = calculate_year_by_year_projection(
+    projection = projection or calculate_year_by_year_projection
+    projection_results = projection(
         inputs,
         target_net_worth,
         monthly_retirement_withdrawal,
         post_retirement_cagr,
+        include_ages,
     )
 
     year_by_year = projection_results['projections']
-    retirement_snapshot = projection_results['retirement_snapshot'] or (year_by_year[-1] if year_by_year else None)
+    retirement_snapshot = projection_results['retirement_snapshot'] or projection_results['projection_end_snapshot']
     projection_end_snapshot = projection_results['projection_end_snapshot']
 
     projected_current_assets = retirement_snapshot['current_assets'] if retirement_snapshot else 0.0
@@ -279,10 +368,10 @@ def calculate_retirement_plan(inputs: RetirementInputs) -> Dict[str, Any]:
     required_monthly_savings = inputs.monthly_savings
     if gap < 0:
         shortfall = abs(gap)
-        monthly_rate = annual_rate_to_monthly(inputs.cagr)
-        if monthly_rate > 0 and months_until_retirement > 0:
-            denominator = (1 + monthly_rate) * ((1 + monthly_rate) ** months_until_retirement - 1)
-            required_monthly_savings = shortfall * (monthly_rate / denominator)
+        factors = factors_for(inputs.cagr, months_until_retirement)
+        if factors.monthly_rate > 0 and months_until_retirement > 0:
+            denominator = (1 + factors.monthly_rate) * (factors.growth_factor - 1)
+            required_monthly_savings = shortfall * (factors.monthly_rate / denominator)
         elif months_until_retirement > 0:
             required_monthly_savings = shortfall / months_until_retirement
         else:
@@ -0,0 +1,116 @@
+"""
+Display-currency conversion for plan inputs and results
+
+Plans are always simulated in the base currency (CAD), because the tax
+brackets are defined in CAD. Everything downstream of the tax step is linear
+in currency, so a base-currency result can be shown in any display currency
+by scaling its money fields; rates, ages and ratios are left unchanged.
+"""
+import math
+import re
+from typing import Dict, Any, Tuple
+
+BASE_CURRENCY = 'CAD'
+CURRENCY_CODE_PATTERN = re.compile(r'^[A-Z]{3}$')
+
+INPUT_MONEY_FIELDS = (
+    'ideal_retirement_income',
+    'current_asset_values',
+    'monthly_savings',
+)
+
+PLAN_MONEY_FIELDS = (
+    'target_net_worth',
+    'projected_current_assets',
+    'projected_savings',
+    'projected_payouts',
+    'total_projected_net_worth',
+    'net_worth_at_projection_end',
+    'gap',
+    'required_monthly_savings',
+    'current_monthly_savings',
+    'pre_tax_retirement_income',
+    'max_sustainable_monthly_income',
+    'max_sustainable_pre_tax_monthly_income',
+)
+
+YEAR_BY_YEAR_MONEY_FIELDS = (
+    'current_assets',
+    'savings_contributions',
+    'payouts_value',
+    'total_net_worth',
+    'target_net_worth',
+    'gap',
+)
+
+
+def parse_display_currency(data: Dict[str, Any]) -> Tuple[str, float]:
+    """
+    Read `currency` and `currency_rate` (units of display currency per CAD) from a request.
+
+    The code must be three letters, and a rate is required for any code but CAD.
+    """
+    code = str(data.get('currency') or BASE_CURRENCY).strip().upper()
+    if not CURRENCY_CODE_PATTERN.match(code):
+        raise ValueError('Currency must be a three-letter code')
+    raw_rate = data.get('currency_rate')
+    if raw_rate in (None, ''):
+        if code != BASE_CURRENCY:
+            raise ValueError(f'Currency rate is required for {code}')
+        return code, 1.0
+
+    try:
+        rate = float(raw_rate)
+    except (TypeError, ValueError):
+        raise ValueError('Currency rate must be a number')
+    if not math.isfinite(rate) or rate <= 0:
+        raise ValueError('Currency rate must be positive')
+    return code, rate
+
+
+def inputs_to_base_currency(data: Dict[str, Any], rate: float) -> Dict[str, Any]:
+    """Convert display-currency input fields to CAD before any tax or simulation step."""
+    if rate == 1:
+        return data
+
+    converted = dict(data)
+    for field in INPUT_MONEY_FIELDS:
+        if field in converted:
+            converted[field] = float(converted[field]) / rate
+    converted['payouts'] = [
+        {**payout, 'amount': float(payout['amount']) / rate}
+        for payout in data.get('payouts', [])
+    ]
+    return converted
+
+
+def convert_plan(plan: Dict[str, Any], code: str = BASE_CURRENCY, rate: float = 1.0) -> Dict[str, Any]:
+    """Return a copy of a CAD plan with money fields in the display currency."""
+    converted = dict(plan)
+    converted['currency'] = {'code': code, 'rate': rate}
+    if rate == 1:
+        return converted
+
+    for field in PLAN_MONEY_FIELDS:
+        if field in converted:
+            converted[field] = converted[field] * rate
+
+    if 'year_by_year' in converted:
+        converted['year_by_year'] = [
+            {**row, **{field: row[field] * rate for field in YEAR_BY_YEAR_MONEY_FIELDS if field in row}}
+            for row in converted['year_by_year']
+        ]
+
+    inputs = converted.get('inputs')
+    if inputs:
+        inputs = dict(inputs)
+        for field in INPUT_MONEY_FIELDS:
+            if field in inputs:
+                inputs[field] = inputs[field] * rate
+        inputs['payouts'] = [
+            {**payout, 'amount': float(payout['amount']) * rate}
+            for payout in inputs.get('payouts', [])
+        ]
+        converted['inputs'] = inputs
+
+    return converted
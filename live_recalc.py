@@ -0,0 +1,228 @@
+"""
+Live recalculation channel for interactive dashboard edits
+
+Clients POST numbered input snapshots and listen on a Server-Sent Events
+stream. Each session keeps only the newest pending snapshot, so bursts of
+edits collapse into one calculation, and results that were superseded while
+being calculated are dropped instead of sent. Updates carry only the fields
+and year_by_year cells that changed since the previous update on the stream.
+"""
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
+
+from calculations import calculate_retirement_plan
+from currency import convert_plan
+from models import RetirementInputs
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+SESSION_TTL_SECONDS = 600
+KEEPALIVE_SECONDS = 15.0
+
+
+def diff_plan(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe `current` relative to `previous` as changed fields and per-row cell changes."""
+    if previous is None:
+        return {'full': True, 'plan': current}
+
+    changed = {
+        key: value for key, value in current.items()
+        if key != 'year_by_year' and previous.get(key) != value
+    }
+    removed = [key for key in previous if key not in current]
+
+    previous_rows = previous.get('year_by_year') or []
+    current_rows = current.get('year_by_year') or []
+    rows: List[List[Any]] = []
+    for index, row in enumerate(current_rows):
+        previous_row = previous_rows[index] if index < len(previous_rows) else {}
+        cells = {field: value for field, value in row.items() if previous_row.get(field) != value}
+        if cells:
+            rows.append([index, cells])
+
+    return {
+        'full': False,
+        'changed': changed,
+        'removed': removed,
+        'year_by_year': {'length': len(current_rows), 'rows': rows},
+    }
+
+
+def apply_plan_diff(previous: Optional[Dict[str, Any]], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of diff_plan; mirrors applyPlanDiff in dashboard.js."""
+    if update.get('full'):
+        return update['plan']
+
+    plan = {key: value for key, value in previous.items() if key not in update['removed']}
+    plan.update(update['changed'])
+
+    year_by_year = update['year_by_year']
+    rows = [dict(row) for row in (previous.get('year_by_year') or [])[:year_by_year['length']]]
+    for index, cells in year_by_year['rows']:
+        if index < len(rows):
+            rows[index].update(cells)
+        else:
+            rows.append(dict(cells))
+    plan['year_by_year'] = rows
+    return plan
+
+
+class LiveSession:
+    """Per-client state: the newest pending inputs and which stream may consume them."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.latest_seq = -1
+        self.pending = None
+        self.stream_generation = 0
+        self.open_streams = 0
+        self.last_seen = time.monotonic()
+
+
+class LiveStream:
+    """One event stream on a session and the last plan it sent."""
+
+    def __init__(self, session: LiveSession, generation: int):
+        self.session = session
+        self.generation = generation
+        self.last_sent = None
+
+    @property
+    def current(self) -> bool:
+        """Only the newest stream on a session consumes pending inputs."""
+        return self.session.stream_generation == self.generation
+
+
+class LiveRecalcHub:
+    """Coalesces live edits per session and turns them into plan diffs."""
+
+    def __init__(
+        self,
+        calculate: Callable[[RetirementInputs], Dict[str, Any]] = calculate_retirement_plan,
+        session_ttl: float = SESSION_TTL_SECONDS,
+    ):
+        self.calculate = calculate
+        self.session_ttl = session_ttl
+        self._sessions: Dict[str, LiveSession] = {}
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str) -> LiveSession:
+        now = time.monotonic()
+        with self._lock:
+            for key, session in list(self._sessions.items()):
+                if not session.open_streams and now - session.last_seen > self.session_ttl:
+                    del self._sessions[key]
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = LiveSession()
+                self._sessions[session_id] = session
+            session.last_seen = now
+            return session
+
+    def submit(
+        self,
+        session_id: str,
+        seq: int,
+        inputs: RetirementInputs,
+        display_currency: Optional[Tuple[str, float]] = None,
+    ) -> bool:
+        """
+        Queue CAD inputs for a session. Returns False if a newer snapshot was already seen.
+
+        When display_currency is given as (code, rate), results are sent in that currency.
+        """
+        session = self._session(session_id)
+        with session.condition:
+            if seq <= session.latest_seq:
+                return False
+            session.latest_seq = seq
+            session.pending = (seq, inputs, display_currency)
+            session.condition.notify_all()
+        return True
+
+    def open_stream(self, session_id: str) -> LiveStream:
+        """Start a new stream on a session, superseding any older one."""
+        session = self._session(session_id)
+        with session.condition:
+            session.stream_generation += 1
+            session.open_streams += 1
+            session.condition.notify_all()
+            return LiveStream(session, session.stream_generation)
+
+    def next_update(
+        self,
+        session_id: str,
+        timeout: float = KEEPALIVE_SECONDS,
+        stream: Optional[LiveStream] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the newest pending inputs and return the diff, or None on timeout.
+
+        Updates are diffed against the last plan sent on `stream`; without one the
+        update is always full. A superseded stream returns None without consuming.
+        """
+        session = self._session(session_id)
+        if stream is None:
+            stream = LiveStream(session, session.stream_generation)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with session.condition:
+                while session.pending is None and stream.current:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    session.condition.wait(remaining)
+                if not stream.current:
+                    return None
+                seq, inputs, display_currency = session.pending
+                session.pending = None
+
+            try:
+                result = self.calculate(inputs)
+                if display_currency is not None:
+                    result = convert_plan(result, *display_currency)
+            except Exception as exc:
+                return {'seq': seq, 'error': str(exc)}
+
+            with session.condition:
+                if session.latest_seq != seq:
+                    # Superseded while calculating; the newer snapshot is already pending.
+                    continue
+                if not stream.current:
+                    # A newer stream opened while calculating; hand the inputs back to it.
+                    if session.pending is None:
+                        session.pending = (seq, inputs, display_currency)
+                        session.condition.notify_all()
+                    return None
+                update = {'seq': seq, **diff_plan(stream.last_sent, result)}
+                stream.last_sent = result
+                return update
+
+    def events(self, session_id: str, keepalive: float = KEEPALIVE_SECONDS) -> Iterator[str]:
+        """
+        Server-Sent Events stream of plan updates for one session.
+
+        Each stream keeps its own diff baseline, so its first update is a full plan.
+        The stream ends once a newer stream opens on the same session.
+        """
+        stream = self.open_stream(session_id)
+        session = stream.session
+
+        try:
+            yield 'retry: 1000\n\n'
+            while True:
+                update = self.next_update(session_id, timeout=keepalive, stream=stream)
+                if update is None:
+                    if not stream.current:
+                        return
+                    yield ': keepalive\n\n'
+                    continue
+                event = 'error' if 'error' in update else 'plan'
+                yield f"event: {event}\ndata: {json.dumps(update, separators=(',', ':'))}\n\n"
+        finally:
+            with session.condition:
+                session.open_streams -= 1
+                session.last_seen = time.monotonic()
@@ -0,0 +1,376 @@
+"""
+Load test for the dashboard API
+
+Each virtual user follows the dashboard's traffic: an onboarding calculation and
+the automatic chat analysis, then a weighted mix of edits (POST /api/calculate),
+currency switches (GET /api/plans/<plan_id>), chat questions and retirement-age
+slider drags (a burst of live inputs, answered over the session's SSE stream).
+
+Concurrency is raised stage by stage; each stage reports p50/p95/p99 latency and
+throughput per route, and the run ends with the stage where throughput stopped
+scaling. Use stub_llm.py so /api/chat does not call OpenAI:
+
+    python stub_llm.py --port 8001 --latency 0.8 &
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python app.py &
+    python loadtest.py --base-url http://127.0.0.1:5001 --concurrency 1,4,16,64 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence
+
+import httpx
+
+DEFAULT_MIX = {'recalculate': 4, 'switch_currency': 2, 'chat': 2, 'live_drag': 2}
+CURRENCY_RATES = {'CAD': 1.0, 'USD': 0.73, 'EUR': 0.68, 'GBP': 0.58}
+ANALYSIS_PROMPT = (
+    'Provide a 1-2 sentence plain-language summary of this retirement plan. '
+    'Keep it under 45 words and avoid markdown.'
+)
+CHAT_QUESTIONS = [
+    'What happens if I retire two years later?',
+    'How much more should I save each month?',
+    'Is my withdrawal rate too aggressive?',
+    'What if my returns are 1% lower?',
+]
+LIVE_DRAG_STEPS = 8
+LIVE_DEBOUNCE_SECONDS = 0.03
+LIVE_UPDATE_TIMEOUT = 30.0
+# A stage counts as saturated when throughput grows by less than this factor.
+SATURATION_GAIN = 1.1
+
+CALCULATE_ROUTE = 'POST /api/calculate'
+PLAN_ROUTE = 'GET /api/plans/<plan_id>'
+CHAT_ROUTE = 'POST /api/chat'
+LIVE_INPUTS_ROUTE = 'POST /api/live/<session_id>/inputs'
+LIVE_UPDATE_ROUTE = 'SSE live update'
+
+
+def sample_inputs(rng: random.Random) -> Dict[str, Any]:
+    """A plausible onboarding payload."""
+    current_age = rng.randint(25, 60)
+    return {
+        'ideal_retirement_income': rng.choice([3000, 4500, 6000, 8000]),
+        'ideal_retirement_age': rng.randint(current_age + 5, 70),
+        'withdrawal_rate': rng.choice([3.5, 4, 4.5]),
+        'current_age': current_age,
+        'current_asset_values': rng.randint(0, 800) * 1000,
+        'cagr': rng.choice([4, 5, 6, 7]),
+        'monthly_savings': rng.randint(0, 40) * 100,
+        'payouts': [{'amount': rng.randint(1, 20) * 10000, 'year': rng.randint(current_age + 1, 90)}],
+    }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse 'recalculate=4,chat=1' into action weights."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown action {name!r} (expected one of {", ".join(DEFAULT_MIX)})')
+        mix[name] = float(weight)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError('At least one action needs a positive weight')
+    return mix
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Latency samples and error counts per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, elapsed: float, ok: bool) -> None:
+        if ok:
+            self.latencies[route].append(elapsed)
+        else:
+            self.errors[route] += 1
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Dict[str, float]]:
+        """Count, errors, throughput and p50/p95/p99 (milliseconds) per route."""
+        routes = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[route])
+            routes[route] = {
+                'count': len(values),
+                'errors': self.errors[route],
+                'rps': len(values) / elapsed_seconds if elapsed_seconds > 0 else 0.0,
+                'p50_ms': percentile(values, 0.50) * 1000,
+                'p95_ms': percentile(values, 0.95) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+            }
+        return routes
+
+
+class VirtualUser:
+    """One dashboard session issuing requests back to back"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        rng: random.Random,
+        mix: Dict[str, float],
+        think_time: float = 0.0,
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.mix = mix
+        self.think_time = think_time
+        self.inputs = sample_inputs(rng)
+        self.currency = 'CAD'
+        self.plan_id: Optional[str] = None
+        self.session_id = uuid.uuid4().hex
+        self.live_seq = 0
+        self.live_received = 0
+        self.live_event = asyncio.Event()
+        self.live_reader: Optional[asyncio.Task] = None
+
+    def currency_params(self) -> Dict[str, Any]:
+        return {'currency': self.currency, 'currency_rate': CURRENCY_RATES[self.currency]}
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+            body = response.json() if ok else None
+        except (httpx.HTTPError, ValueError):
+            ok, body = False, None
+        self.recorder.record(route, time.perf_counter() - started, ok)
+        return body
+
+    async def calculate(self) -> None:
+        plan = await self.request(CALCULATE_ROUTE, 'POST', '/api/calculate', json={
+            **self.inputs,
+            **self.currency_params(),
+        })
+        if plan:
+            self.plan_id = plan.get('plan_id')
+
+    async def ask(self, message: str) -> None:
+        if self.plan_id:
+            await self.request(CHAT_ROUTE, 'POST', '/api/chat', json={
+                'message': message,
+                'plan_id': self.plan_id,
+                **self.currency_params(),
+            })
+
+    async def start(self) -> None:
+        """Onboarding submit, then the dashboard's automatic plan analysis."""
+        await self.calculate()
+        await self.ask(ANALYSIS_PROMPT)
+
+    async def recalculate(self) -> None:
+        self.inputs['monthly_savings'] = max(0, self.inputs['monthly_savings'] + self.rng.choice([-200, 200, 500]))
+        await self.calculate()
+
+    async def switch_currency(self) -> None:
+        self.currency = self.rng.choice([code for code in CURRENCY_RATES if code != self.currency])
+        if self.plan_id:
+            await self.request(PLAN_ROUTE, 'GET', f'/api/plans/{self.plan_id}', params=self.currency_params())
+
+    async def chat(self) -> None:
+        await self.ask(self.rng.choice(CHAT_QUESTIONS))
+
+    async def read_live_events(self) -> None:
+        url = f'/api/live/{self.session_id}/events'
+        try:
+            async with self.client.stream('GET', url, timeout=httpx.Timeout(None, connect=10.0)) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith('data:'):
+                        self.live_received = max(self.live_received, json.loads(line[5:]).get('seq', 0))
+                        self.live_event.set()
+        except (httpx.HTTPError, ValueError):
+            pass
+
+    async def live_drag(self) -> None:
+        """Drag the retirement-age slider: a debounced burst of inputs, then wait for the final plan."""
+        if self.live_reader is None:
+            self.live_reader = asyncio.create_task(self.read_live_events())
+
+        retirement_age = self.inputs['ideal_retirement_age']
+        ages = [
+            min(100, max(self.inputs['current_age'] + 1, retirement_age + self.rng.randint(-5, 5)))
+            for _ in range(LIVE_DRAG_STEPS)
+        ]
+        for age in ages:
+            self.live_seq += 1
+            last_sent = time.perf_counter()
+            await self.request(LIVE_INPUTS_ROUTE, 'POST', f'/api/live/{self.session_id}/inputs', json={
+                'seq': self.live_seq,
+                'inputs': {**self.inputs, 'ideal_retirement_age': age},
+                **self.currency_params(),
+            })
+            await asyncio.sleep(LIVE_DEBOUNCE_SECONDS)
+
+        # Latency runs from sending the final slider position to receiving its plan.
+        deadline = time.perf_counter() + LIVE_UPDATE_TIMEOUT
+        while True:
+            self.live_event.clear()
+            if self.live_received >= self.live_seq or time.perf_counter() >= deadline:
+                break
+            try:
+                await asyncio.wait_for(self.live_event.wait(), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+        self.recorder.record(LIVE_UPDATE_ROUTE, time.perf_counter() - last_sent, self.live_received >= self.live_seq)
+        self.inputs['ideal_retirement_age'] = ages[-1]
+
+    async def run(self, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        actions = [name for name, weight in self.mix.items() if weight > 0]
+        weights = [self.mix[name] for name in actions]
+        try:
+            await self.start()
+            while loop.time() < deadline:
+                action = self.rng.choices(actions, weights)[0]
+                await getattr(self, action)()
+                if self.think_time:
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+        finally:
+            if self.live_reader is not None:
+                self.live_reader.cancel()
+                await asyncio.gather(self.live_reader, return_exceptions=True)
+
+
+async def run_stage(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, float],
+    think_time: float = 0.0,
+    seed: int = 0,
+    timeout: float = 120.0,
+) -> Dict[str, Any]:
+    """Run `concurrency` virtual users for `duration` seconds and summarize the stage."""
+    recorder = Recorder()
+    # Each user may hold a request and its live event stream open at once.
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        users = [
+            VirtualUser(client, recorder, random.Random(seed * 100003 + index), mix, think_time)
+            for index in range(concurrency)
+        ]
+        started = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + duration
+        await asyncio.gather(*(user.run(deadline) for user in users))
+        elapsed = time.perf_counter() - started
+
+    routes = recorder.summary(elapsed)
+    requests = [stats for route, stats in routes.items() if route != LIVE_UPDATE_ROUTE]
+    return {
+        'concurrency': concurrency,
+        'elapsed_seconds': elapsed,
+        'requests': sum(stats['count'] for stats in requests),
+        'errors': sum(stats['errors'] for stats in requests),
+        'rps': sum(stats['rps'] for stats in requests),
+        'routes': routes,
+    }
+
+
+def find_saturation(stages: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The first stage whose throughput grew by less than SATURATION_GAIN over the previous one."""
+    for previous, stage in zip(stages, stages[1:]):
+        if stage['rps'] < previous['rps'] * SATURATION_GAIN:
+            return stage
+    return None
+
+
+def format_stage(stage: Dict[str, Any]) -> str:
+    lines = [
+        f"concurrency {stage['concurrency']}: {stage['requests']} requests, {stage['errors']} errors, "
+        f"{stage['rps']:.1f} req/s over {stage['elapsed_seconds']:.1f}s",
+        f"  {'route':<36}{'count':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for route, stats in stage['routes'].items():
+        lines.append(
+            f"  {route:<36}{stats['count']:>7}{stats['errors']:>8}{stats['rps']:>9.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def format_saturation(stages: Sequence[Dict[str, Any]]) -> str:
+    saturated = find_saturation(stages)
+    if saturated is None:
+        return 'Throughput kept scaling through the highest concurrency tested.'
+    index = list(stages).index(saturated)
+    previous = stages[index - 1]
+    return (
+        f"Saturation at concurrency {saturated['concurrency']}: throughput went from "
+        f"{previous['rps']:.1f} to {saturated['rps']:.1f} req/s "
+        f"(from concurrency {previous['concurrency']}); extra users now mostly add latency."
+    )
+
+
+async def run(
+    base_url: str,
+    concurrency_levels: Sequence[int],
+    duration: float,
+    mix: Dict[str, float],
+    think_time: float = 0.0,
+    seed: int = 0,
+    output=sys.stdout,
+) -> List[Dict[str, Any]]:
+    stages = []
+    for concurrency in concurrency_levels:
+        stage = await run_stage(base_url, concurrency, duration, mix, think_time, seed)
+        stages.append(stage)
+        print(format_stage(stage) + '\n', file=output, flush=True)
+    if len(stages) > 1:
+        print(format_saturation(stages), file=output)
+    return stages
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test /api/calculate, /api/chat and the live channel.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5001', help='app URL (default: %(default)s)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32', help='comma-separated virtual users per stage')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds per stage (default: 15)')
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean seconds between a user\'s actions')
+    parser.add_argument(
+        '--mix',
+        default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+        help='action weights (default: %(default)s)',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='also write the stage results to this file')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(level) for level in args.concurrency.split(',')]
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 2
+    if any(level < 1 for level in levels):
+        print('Concurrency levels must be positive', file=sys.stderr)
+        return 2
+
+    stages = asyncio.run(run(args.base_url, levels, args.duration, mix, args.think_time, args.seed))
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump(stages, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
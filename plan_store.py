@@ -0,0 +1,214 @@
+"""
+Server-side plan storage keyed by a content hash of normalized inputs
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import zlib
+from contextlib import closing
+from typing import AbstractSet, Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+from calculations import calculate_retirement_plan, calculate_year_by_year_projection, make_projection_row
+from models import RetirementInputs
+from projection_output import ProjectionOptions
+
+# Bump when calculation semantics change so stale results are not served.
+PLAN_STORE_VERSION = 1
+PLAN_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Only the independent per-year columns are stored; the rest are rebuilt on load.
+YEAR_BY_YEAR_COLUMNS = ('current_assets', 'savings_contributions', 'payouts_value')
+
+_HEADER_FORMAT = '<HI'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+
+def normalize_inputs(inputs: RetirementInputs) -> Dict[str, Any]:
+    """Canonical form of the inputs, independent of payload formatting and payout order."""
+    payouts = sorted(
+        ({'amount': float(payout['amount']), 'year': int(payout['year'])} for payout in inputs.payouts),
+        key=lambda payout: (payout['year'], payout['amount']),
+    )
+    return {
+        'ideal_retirement_income': float(inputs.ideal_retirement_income),
+        'ideal_retirement_age': int(inputs.ideal_retirement_age),
+        'withdrawal_rate': float(inputs.withdrawal_rate),
+        'current_age': int(inputs.current_age),
+        'current_asset_values': float(inputs.current_asset_values),
+        'cagr': float(inputs.cagr),
+        'monthly_savings': float(inputs.monthly_savings),
+        'payouts': payouts,
+    }
+
+
+def compute_plan_id(inputs: RetirementInputs) -> str:
+    """Stable plan ID: a SHA-256 of the normalized inputs and the store version."""
+    canonical = json.dumps(
+        {'version': PLAN_STORE_VERSION, 'inputs': normalize_inputs(inputs)},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def encode_year_end_balances(start_age: int, year_end_balances: Sequence[Sequence[float]]) -> bytes:
+    """Pack per-year balances (in YEAR_BY_YEAR_COLUMNS order) as compressed little-endian float64 columns."""
+    row_count = len(year_end_balances)
+    parts = [struct.pack(_HEADER_FORMAT, start_age, row_count)]
+    for index in range(len(YEAR_BY_YEAR_COLUMNS)):
+        parts.append(struct.pack(f'<{row_count}d', *(balances[index] for balances in year_end_balances)))
+    return zlib.compress(b''.join(parts))
+
+
+def encode_year_by_year(year_by_year: List[Dict[str, Any]]) -> bytes:
+    """Pack full projection rows; same format as encode_year_end_balances."""
+    start_age = int(year_by_year[0]['age']) if year_by_year else 0
+    return encode_year_end_balances(
+        start_age,
+        [tuple(row[column] for column in YEAR_BY_YEAR_COLUMNS) for row in year_by_year],
+    )
+
+
+def decode_year_by_year(
+    blob: bytes,
+    target_net_worth: float,
+    include_ages: Optional[AbstractSet[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rebuild projection rows exactly as calculate_year_by_year_projection emits them.
+
+    Only ages in include_ages are turned into rows when it is given.
+    """
+    raw = zlib.decompress(blob)
+    start_age, row_count = struct.unpack_from(_HEADER_FORMAT, raw)
+    column_size = row_count * 8
+    columns = [
+        struct.unpack_from(f'<{row_count}d', raw, _HEADER_SIZE + index * column_size)
+        for index in range(len(YEAR_BY_YEAR_COLUMNS))
+    ]
+
+    return [
+        make_projection_row(start_age + offset, current_assets, savings, payouts_value, target_net_worth)
+        for offset, (current_assets, savings, payouts_value) in enumerate(zip(*columns))
+        if include_ages is None or start_age + offset in include_ages
+    ]
+
+
+class PlanStore:
+    """SQLite-backed store of calculated plans, deduplicated by plan ID."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS plans ('
+                ' plan_id TEXT PRIMARY KEY,'
+                ' inputs TEXT NOT NULL,'
+                ' summary TEXT NOT NULL,'
+                ' year_by_year BLOB NOT NULL,'
+                ' created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP'
+                ')'
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, plan_id: str, options: Optional[ProjectionOptions] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a stored plan in the same shape as calculate_retirement_plan, or None.
+
+        With options, only the year_by_year rows those options can return are rebuilt.
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT inputs, summary, year_by_year FROM plans WHERE plan_id = ?',
+                (plan_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        inputs_json, summary_json, blob = row
+        result = json.loads(summary_json)
+        result['inputs'] = json.loads(inputs_json)
+        include_ages = options.include_ages(
+            int(result['inputs']['current_age']),
+            int(result['inputs']['ideal_retirement_age']),
+        ) if options is not None else None
+        if include_ages is not None and not include_ages:
+            result['year_by_year'] = []
+        else:
+            result['year_by_year'] = decode_year_by_year(blob, result['target_net_worth'], include_ages)
+        result['plan_id'] = plan_id
+        return result
+
+    def put(self, inputs: RetirementInputs, result: Dict[str, Any], year_by_year_blob: Optional[bytes] = None) -> str:
+        """
+        Store a calculated plan once; identical inputs share a single row.
+
+        year_by_year_blob replaces encoding result['year_by_year'], for results
+        calculated with only some of their rows.
+        """
+        plan_id = compute_plan_id(inputs)
+        if year_by_year_blob is None:
+            year_by_year_blob = encode_year_by_year(result['year_by_year'])
+        summary = {
+            key: value for key, value in result.items()
+            if key not in ('year_by_year', 'inputs', 'plan_id')
+        }
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO plans (plan_id, inputs, summary, year_by_year) VALUES (?, ?, ?, ?)',
+                (
+                    plan_id,
+                    json.dumps(result['inputs'], separators=(',', ':')),
+                    json.dumps(summary, separators=(',', ':')),
+                    year_by_year_blob,
+                ),
+            )
+        return plan_id
+
+    def get_or_calculate(
+        self,
+        inputs: RetirementInputs,
+        options: Optional[ProjectionOptions] = None,
+        on_lookup: Optional[Callable[[bool], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Return the stored plan for these inputs, calculating and storing it on a miss.
+
+        on_lookup, if given, is called with True on a hit and False on a miss.
+
+        options limit the returned year_by_year rows. On a miss only those rows are
+        built; the full projection is stored from the simulation's year-end balances.
+        """
+        normalized = normalize_inputs(inputs)
+        inputs = RetirementInputs(**normalized)
+        plan_id = compute_plan_id(inputs)
+
+        stored = self.get(plan_id, options)
+        if on_lookup is not None:
+            on_lookup(stored is not None)
+        if stored is not None:
+            return stored
+
+        include_ages = options.include_ages(
+            inputs.current_age, inputs.ideal_retirement_age,
+        ) if options is not None else None
+        year_end_balances: List[Tuple[float, float, float]] = []
+        projection = functools.partial(calculate_year_by_year_projection, year_end_balances=year_end_balances)
+        result = calculate_retirement_plan(inputs, include_ages, projection=projection)
+        blob = encode_year_end_balances(inputs.current_age, year_end_balances)
+        self.put(inputs, result, blob)
+        result['plan_id'] = plan_id
+        return result
+
+    def count(self) -> int:
+        """Number of distinct plans stored."""
+        with closing(self._connect()) as connection:
+            return connection.execute('SELECT COUNT(*) FROM plans').fetchone()[0]
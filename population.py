@@ -0,0 +1,586 @@
+"""
+Retirement-readiness analytics across a client population
+
+Clients arrive as a columnar table (a CSV file or a dict of arrays, one column per
+input field) and are processed in chunks. Each chunk's KPIs are computed as arrays
+with calculate_retirement_plan semantics, using the bucket kernel without per-year
+recording, and folded into per-group summaries (client counts, on-track and
+depletion shares, percentiles, depletion-age histograms) by age band and/or
+province. No per-client year_by_year is built, and chunks are discarded once
+folded in: each group keeps running counts, sums and extremes plus a
+log-binned QuantileSketch per metric, so memory is fixed per group whatever
+the book size, and percentiles are within SKETCH_RELATIVE_ACCURACY of the
+true value. exact_percentiles=True (--exact-percentiles) keeps every KPI
+value instead, for exact percentiles at linear memory cost.
+
+    python population.py generate 100000 clients.csv
+    python population.py summarize clients.csv --group-by province,age_band
+
+Taxes follow tax_calculator (federal + Ontario) for every client; province is a
+grouping column only.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from accounts import simulate_buckets
+from annuity_factors import factor_arrays
+from calculations import (
+    PROJECTION_END_AGE,
+    calculate_required_retirement_balance_array,
+    calculate_sustainable_monthly_withdrawal_array,
+)
+from tax_calculator import (
+    calculate_after_tax_income_array,
+    calculate_canadian_tax_rate_array,
+    calculate_pre_tax_income_needed_array,
+)
+
+INPUT_COLUMNS = (
+    'ideal_retirement_income',
+    'ideal_retirement_age',
+    'withdrawal_rate',
+    'current_age',
+    'current_asset_values',
+    'cagr',
+    'monthly_savings',
+)
+# Optional columns: one payout per client, and a province for grouping.
+PAYOUT_COLUMNS = ('payout_amount', 'payout_age')
+TEXT_COLUMNS = ('client_id', 'province')
+GROUP_COLUMNS = ('age_band', 'province')
+SUMMARY_METRICS = (
+    'gap',
+    'gap_percentage',
+    'total_projected_net_worth',
+    'required_monthly_savings',
+    'income_goal_coverage_ratio',
+    'depletion_age',
+)
+PERCENTILES = (10, 25, 50, 75, 90)
+AGE_BAND_WIDTH = 10
+DEPLETION_BIN_WIDTH = 5
+DEFAULT_CHUNK_SIZE = 20000
+# Sketch percentiles are within 1% of the true value for magnitudes in
+# [SKETCH_MIN_MAGNITUDE, SKETCH_MAX_MAGNITUDE]; smaller ones count as zero.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MIN_MAGNITUDE = 1e-6
+SKETCH_MAX_MAGNITUDE = 1e12
+
+
+def valid_rows(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Boolean mask of rows that validate_inputs would accept."""
+    income = columns['ideal_retirement_income']
+    retirement_age = columns['ideal_retirement_age']
+    current_age = columns['current_age']
+    withdrawal_rate = columns['withdrawal_rate']
+    cagr = columns['cagr']
+    with np.errstate(invalid='ignore'):
+        valid = (
+            (income > 0)
+            & (current_age >= 0) & (current_age < 100)
+            & (retirement_age > current_age) & (retirement_age <= PROJECTION_END_AGE)
+            & (withdrawal_rate > 0) & (withdrawal_rate <= 100)
+            & (columns['current_asset_values'] >= 0)
+            & (cagr >= -100) & (cagr <= 100)
+            & (columns['monthly_savings'] >= 0)
+        )
+        if 'payout_amount' in columns:
+            amount, age = columns['payout_amount'], columns['payout_age']
+            has_payout = ~np.isnan(amount) | ~np.isnan(age)
+            payout_ok = (amount >= 0) & (age > current_age) & (age <= PROJECTION_END_AGE)
+            valid &= ~has_payout | payout_ok
+    return valid
+
+
+def calculate_population_kpis(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    calculate_retirement_plan KPIs for every (valid) row, as arrays.
+
+    Matches the scalar plan to floating-point rounding; depletion_age is NaN
+    for clients whose money lasts to PROJECTION_END_AGE.
+    """
+    income = np.asarray(columns['ideal_retirement_income'], dtype=float)
+    current_age = np.asarray(columns['current_age']).astype(int)
+    retirement_age = np.asarray(columns['ideal_retirement_age']).astype(int)
+    withdrawal_rate = np.asarray(columns['withdrawal_rate'], dtype=float) / 100
+    cagr = np.asarray(columns['cagr'], dtype=float) / 100
+    current_assets = np.asarray(columns['current_asset_values'], dtype=float)
+    monthly_savings = np.asarray(columns['monthly_savings'], dtype=float)
+    client_count = len(income)
+
+    pre_tax_retirement_income = calculate_pre_tax_income_needed_array(income * 12)
+    months_until_retirement = (retirement_age - current_age) * 12
+    months_in_retirement = np.maximum(0, (PROJECTION_END_AGE - retirement_age) * 12)
+    monthly_retirement_withdrawal = pre_tax_retirement_income / 12
+    post_retirement_cagr = np.minimum(cagr, withdrawal_rate)
+    target_net_worth = calculate_required_retirement_balance_array(
+        monthly_retirement_withdrawal, post_retirement_cagr, months_in_retirement,
+    )
+
+    # Accounts in withdrawal order: payouts, savings contributions, existing assets.
+    pre_retirement_factors = factor_arrays(cagr, months_until_retirement)
+    pre_rate = pre_retirement_factors.monthly_rate
+    post_rate = factor_arrays(post_retirement_cagr, 0).monthly_rate
+    horizon_months = np.maximum(0, (PROJECTION_END_AGE - current_age) * 12)
+    zeros = np.zeros(client_count)
+    simulation = simulate_buckets(
+        balances=np.column_stack((zeros, zeros, current_assets)),
+        monthly_contributions=np.column_stack((zeros, np.maximum(monthly_savings, 0.0), zeros)),
+        contribution_start_months=np.zeros((client_count, 3)),
+        contribution_end_months=np.repeat(months_until_retirement[:, None], 3, axis=1),
+        pre_retirement_rates=np.repeat(pre_rate[:, None], 3, axis=1),
+        post_retirement_rates=np.repeat(post_rate[:, None], 3, axis=1),
+        withdrawal_costs=np.ones((client_count, 3)),
+        monthly_withdrawals=monthly_retirement_withdrawal,
+        retirement_months=months_until_retirement,
+        horizon_months=horizon_months,
+        deposits=payout_deposits(columns, current_age, horizon_months),
+        record_years=False,
+    )
+
+    def net_worth(balances: np.ndarray) -> np.ndarray:
+        # Same addition order as make_projection_row.
+        return balances[:, 2] + balances[:, 1] + balances[:, 0]
+
+    retirement_balances = simulation['retirement_balances']
+    retirement_balances = np.where(np.isnan(retirement_balances), simulation['end_balances'], retirement_balances)
+    total_projected_net_worth = net_worth(retirement_balances)
+
+    gap = total_projected_net_worth - target_net_worth
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap_percentage = np.where(target_net_worth > 0, gap / target_net_worth * 100, 0.0)
+        shortfall = np.abs(gap)
+        denominator = (1 + pre_rate) * (pre_retirement_factors.growth_factor - 1)
+        extra_savings = np.where(
+            (pre_rate > 0) & (months_until_retirement > 0),
+            shortfall * (pre_rate / denominator),
+            np.where(months_until_retirement > 0, shortfall / months_until_retirement, shortfall),
+        )
+    required_monthly_savings = np.where(gap < 0, extra_savings + monthly_savings, monthly_savings)
+
+    sustainable_pre_tax_monthly_income = calculate_sustainable_monthly_withdrawal_array(
+        total_projected_net_worth, post_retirement_cagr, months_in_retirement,
+    )
+    max_sustainable_monthly_income = calculate_after_tax_income_array(sustainable_pre_tax_monthly_income * 12) / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        income_goal_coverage_ratio = np.where(income > 0, max_sustainable_monthly_income / income, 0.0)
+
+    return {
+        'target_net_worth': target_net_worth,
+        'total_projected_net_worth': total_projected_net_worth,
+        'gap': gap,
+        'gap_percentage': gap_percentage,
+        'required_monthly_savings': required_monthly_savings,
+        'net_worth_at_projection_end': net_worth(simulation['end_balances']),
+        'depletion_age': current_age + simulation['depletion_months'] / 12,
+        'retirement_tax_rate': calculate_canadian_tax_rate_array(pre_tax_retirement_income) * 100,
+        'pre_tax_retirement_income': pre_tax_retirement_income,
+        'max_sustainable_monthly_income': max_sustainable_monthly_income,
+        'income_goal_coverage_ratio': income_goal_coverage_ratio,
+    }
+
+
+def payout_deposits(
+    columns: Dict[str, np.ndarray],
+    current_age: np.ndarray,
+    horizon_months: np.ndarray,
+) -> Dict[int, tuple]:
+    """simulate_buckets deposits for the optional payout columns (payouts are account 0)."""
+    if 'payout_amount' not in columns:
+        return {}
+    amounts = np.asarray(columns['payout_amount'], dtype=float)
+    ages = np.asarray(columns['payout_age'], dtype=float)
+    present = ~np.isnan(amounts) & ~np.isnan(ages)
+    payout_ages = np.where(present, ages, -1).astype(int)
+    months = (payout_ages - current_age) * 12
+    scheduled = present & (payout_ages <= PROJECTION_END_AGE) & (months >= 0) & (months <= horizon_months)
+    clients = np.flatnonzero(scheduled)
+    deposits = {}
+    for month in np.unique(months[clients]):
+        in_month = clients[months[clients] == month]
+        deposits[int(month)] = (in_month, np.zeros(len(in_month), dtype=int), amounts[in_month])
+    return deposits
+
+
+def age_bands(current_ages: np.ndarray, width: int = AGE_BAND_WIDTH) -> np.ndarray:
+    """Labels such as '30-39' for each current age."""
+    starts = (np.asarray(current_ages).astype(int) // width) * width
+    labels = {start: f'{start}-{start + width - 1}' for start in np.unique(starts).tolist()}
+    return np.array([labels[start] for start in starts.tolist()], dtype=object)
+
+
+def _json_number(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class QuantileSketch:
+    """
+    Fixed-memory percentiles with bounded relative error (DDSketch-style bins)
+
+    Values are counted in log-spaced bins by magnitude, one set per sign, so a
+    percentile is off by at most relative_accuracy inside the magnitude range.
+    Count, sum, min and max are exact.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+        min_magnitude: float = SKETCH_MIN_MAGNITUDE,
+        max_magnitude: float = SKETCH_MAX_MAGNITUDE,
+    ):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_magnitude = min_magnitude
+        self.max_magnitude = max_magnitude
+        self.offset = math.floor(math.log(min_magnitude) / self.log_gamma)
+        bin_count = math.ceil(math.log(max_magnitude) / self.log_gamma) - self.offset + 1
+        self.positive = np.zeros(bin_count, dtype=np.int64)
+        self.negative = np.zeros(bin_count, dtype=np.int64)
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: np.ndarray) -> None:
+        """Count the non-NaN values."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        magnitudes = np.minimum(np.abs(values), self.max_magnitude)
+        binned = magnitudes >= self.min_magnitude
+        self.zero += int(np.count_nonzero(~binned))
+        indexes = np.ceil(np.log(magnitudes[binned]) / self.log_gamma).astype(np.int64) - self.offset
+        indexes = np.clip(indexes, 0, len(self.positive) - 1)
+        negative = values[binned] < 0
+        self.positive += np.bincount(indexes[~negative], minlength=len(self.positive))
+        self.negative += np.bincount(indexes[negative], minlength=len(self.negative))
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Fold in a sketch built with the same settings."""
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, percentiles: Sequence[float]) -> List[Optional[float]]:
+        """Estimated percentiles (0-100), or None for each when the sketch is empty."""
+        if not self.count:
+            return [None] * len(percentiles)
+        magnitudes = 2 * self.gamma ** (np.arange(len(self.positive)) + self.offset) / (self.gamma + 1)
+        values = np.concatenate((-magnitudes[::-1], [0.0], magnitudes))
+        cumulative = np.cumsum(np.concatenate((self.negative[::-1], [self.zero], self.positive)))
+        estimates = []
+        for p in percentiles:
+            rank = round(p / 100 * (self.count - 1))
+            index = int(np.searchsorted(cumulative, rank, side='right'))
+            estimates.append(min(max(float(values[index]), self.min), self.max))
+        return estimates
+
+
+class PopulationSummary:
+    """Aggregates KPI chunks into per-group statistics"""
+
+    def __init__(
+        self,
+        group_by: Sequence[str] = (),
+        percentiles: Sequence[float] = PERCENTILES,
+        metrics: Sequence[str] = SUMMARY_METRICS,
+        exact_percentiles: bool = False,
+    ):
+        unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f'Cannot group by {", ".join(unknown)} (expected {", ".join(GROUP_COLUMNS)})')
+        self.group_by = tuple(group_by)
+        self.percentiles = tuple(percentiles)
+        self.metrics = tuple(metrics)
+        self.exact_percentiles = exact_percentiles
+        self._groups: Dict[tuple, Dict[str, Any]] = {}
+
+    def _group_labels(self, columns: Dict[str, np.ndarray], name: str) -> np.ndarray:
+        if name == 'age_band':
+            return age_bands(columns['current_age'])
+        if 'province' not in columns:
+            return np.full(len(columns['current_age']), 'unknown', dtype=object)
+        return np.asarray(columns['province'], dtype=object)
+
+    def add(self, columns: Dict[str, np.ndarray], kpis: Dict[str, np.ndarray]) -> None:
+        """Fold one chunk of clients (input columns plus their KPI arrays) into the summary."""
+        client_count = len(kpis['gap'])
+        if not client_count:
+            return
+
+        codes = np.zeros(client_count, dtype=np.int64)
+        labels: List[np.ndarray] = []
+        for name in self.group_by:
+            values, inverse = np.unique(self._group_labels(columns, name).astype(str), return_inverse=True)
+            labels.append(values)
+            codes = codes * len(values) + inverse.reshape(-1)
+
+        order = np.argsort(codes, kind='stable')
+        group_codes, starts = np.unique(codes[order], return_index=True)
+        bounds = list(starts[1:]) + [client_count]
+        for code, start, stop in zip(group_codes.tolist(), starts.tolist(), bounds):
+            rows = order[start:stop]
+            key = []
+            for values in reversed(labels):
+                code, index = divmod(code, len(values))
+                key.append(str(values[index]))
+            self._add_group(tuple(reversed(key)), {name: values[rows] for name, values in kpis.items()})
+
+    def _add_group(self, key: tuple, kpis: Dict[str, np.ndarray]) -> None:
+        state = self._groups.get(key)
+        if state is None:
+            state = {
+                'clients': 0,
+                'on_track': 0,
+                'depleted': 0,
+                'sketches': {metric: QuantileSketch() for metric in self.metrics},
+                'values': {metric: [] for metric in self.metrics} if self.exact_percentiles else None,
+                'depletion_bins': np.zeros(PROJECTION_END_AGE // DEPLETION_BIN_WIDTH + 1, dtype=np.int64),
+            }
+            self._groups[key] = state
+
+        depletion_age = kpis['depletion_age']
+        depleted = ~np.isnan(depletion_age)
+        state['clients'] += len(depletion_age)
+        state['on_track'] += int(np.count_nonzero(kpis['gap'] >= 0))
+        state['depleted'] += int(np.count_nonzero(depleted))
+        bins = (depletion_age[depleted] // DEPLETION_BIN_WIDTH).astype(int)
+        state['depletion_bins'] += np.bincount(bins, minlength=len(state['depletion_bins']))[:len(state['depletion_bins'])]
+        for metric in self.metrics:
+            state['sketches'][metric].add(kpis[metric])
+            if state['values'] is not None:
+                state['values'][metric].append(kpis[metric])
+
+    def _metric_summary(self, sketch: QuantileSketch, chunks: Optional[List[np.ndarray]]) -> Dict[str, Optional[float]]:
+        summary = {'count': sketch.count}
+        if not sketch.count:
+            summary.update({'mean': None, 'min': None, 'max': None})
+            summary.update({f'p{p:g}': None for p in self.percentiles})
+            return summary
+        summary.update({'mean': sketch.total / sketch.count, 'min': sketch.min, 'max': sketch.max})
+        if chunks is None:
+            estimates = sketch.percentiles(self.percentiles)
+        else:
+            values = np.concatenate(chunks)
+            estimates = np.percentile(values[~np.isnan(values)], self.percentiles)
+        for p, value in zip(self.percentiles, estimates):
+            summary[f'p{p:g}'] = _json_number(value)
+        return summary
+
+    def _group_result(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        clients = state['clients']
+        return {
+            'clients': clients,
+            'on_track_share': state['on_track'] / clients,
+            'depleted_share': state['depleted'] / clients,
+            'metrics': {
+                metric: self._metric_summary(
+                    state['sketches'][metric],
+                    state['values'][metric] if state['values'] is not None else None,
+                )
+                for metric in self.metrics
+            },
+            'depletion_age_histogram': [
+                {'from': index * DEPLETION_BIN_WIDTH, 'to': (index + 1) * DEPLETION_BIN_WIDTH, 'clients': int(count)}
+                for index, count in enumerate(state['depletion_bins'].tolist())
+                if count
+            ],
+        }
+
+    def result(self) -> List[Dict[str, Any]]:
+        """One JSON-ready dict per group, sorted by group labels."""
+        return [
+            {**dict(zip(self.group_by, key)), **self._group_result(self._groups[key])}
+            for key in sorted(self._groups)
+        ]
+
+    def total(self) -> Optional[Dict[str, Any]]:
+        """The same statistics over every group combined, or None before any clients."""
+        states = list(self._groups.values())
+        if not states:
+            return None
+        sketches = {metric: QuantileSketch() for metric in self.metrics}
+        for state in states:
+            for metric in self.metrics:
+                sketches[metric].merge(state['sketches'][metric])
+        return self._group_result({
+            'clients': sum(state['clients'] for state in states),
+            'on_track': sum(state['on_track'] for state in states),
+            'depleted': sum(state['depleted'] for state in states),
+            'sketches': sketches,
+            'values': {
+                metric: [chunk for state in states for chunk in state['values'][metric]]
+                for metric in self.metrics
+            } if self.exact_percentiles else None,
+            'depletion_bins': sum(state['depletion_bins'] for state in states),
+        })
+
+
+def summarize_population(
+    chunks: Iterable[Dict[str, np.ndarray]],
+    group_by: Sequence[str] = (),
+    percentiles: Sequence[float] = PERCENTILES,
+    exact_percentiles: bool = False,
+) -> Dict[str, Any]:
+    """Summarize a client table given as column chunks (invalid rows are counted and skipped)."""
+    summary = PopulationSummary(group_by, percentiles, exact_percentiles=exact_percentiles)
+    started = time.perf_counter()
+    clients = invalid = 0
+
+    for chunk in chunks:
+        valid = valid_rows(chunk)
+        invalid += int(np.count_nonzero(~valid))
+        chunk = {name: values[valid] for name, values in chunk.items()}
+        clients += int(np.count_nonzero(valid))
+        summary.add(chunk, calculate_population_kpis(chunk))
+
+    return {
+        'clients': clients,
+        'invalid_rows': invalid,
+        'elapsed_seconds': time.perf_counter() - started,
+        'group_by': list(group_by),
+        'overall': summary.total(),
+        'groups': summary.result() if group_by else [],
+    }
+
+
+def iter_chunks(columns: Dict[str, np.ndarray], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+    """Split an in-memory column table into row chunks."""
+    row_count = len(columns['current_age'])
+    for start in range(0, row_count, chunk_size):
+        yield {name: values[start:start + chunk_size] for name, values in columns.items()}
+
+
+def _parse_number(text: str) -> float:
+    text = (text or '').strip()
+    try:
+        return float(text) if text else np.nan
+    except ValueError:
+        return np.nan
+
+
+def read_clients_csv(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream a client CSV as column chunks. Missing numbers become NaN (and fail validation)."""
+    with open(path, newline='') as handle:
+        reader = csv.DictReader(handle)
+        fields = reader.fieldnames or []
+        missing = [name for name in INPUT_COLUMNS if name not in fields]
+        if missing:
+            raise ValueError(f'{path} is missing columns: {", ".join(missing)}')
+        numeric = [name for name in INPUT_COLUMNS + PAYOUT_COLUMNS if name in fields]
+        text = [name for name in TEXT_COLUMNS if name in fields]
+
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield _rows_to_columns(rows, numeric, text)
+                rows = []
+        if rows:
+            yield _rows_to_columns(rows, numeric, text)
+
+
+def _rows_to_columns(rows: List[Dict[str, str]], numeric: Sequence[str], text: Sequence[str]) -> Dict[str, np.ndarray]:
+    columns = {name: np.array([_parse_number(row[name]) for row in rows]) for name in numeric}
+    if 'payout_amount' in columns and 'payout_age' not in columns:
+        columns['payout_age'] = np.full(len(rows), np.nan)
+    if 'payout_age' in columns and 'payout_amount' not in columns:
+        columns['payout_amount'] = np.full(len(rows), np.nan)
+    for name in text:
+        columns[name] = np.array([(row[name] or '').strip() for row in rows], dtype=object)
+    return columns
+
+
+def generate_clients(count: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """A synthetic client book for benchmarks and demos."""
+    rng = np.random.default_rng(seed)
+    current_age = rng.integers(22, 75, count)
+    retirement_age = np.minimum(PROJECTION_END_AGE, np.maximum(current_age + 1, rng.integers(55, 71, count)))
+    has_payout = rng.random(count) < 0.3
+    return {
+        'client_id': np.array([f'C{index:07d}' for index in range(count)], dtype=object),
+        'province': rng.choice(['AB', 'BC', 'MB', 'NS', 'ON', 'QC'], count).astype(object),
+        'ideal_retirement_income': rng.choice([2500.0, 3500.0, 5000.0, 6500.0, 8000.0], count),
+        'ideal_retirement_age': retirement_age.astype(float),
+        'withdrawal_rate': rng.choice([3.5, 4.0, 4.5, 5.0], count),
+        'current_age': current_age.astype(float),
+        'current_asset_values': np.round(rng.lognormal(11.5, 1.2, count), 2),
+        'cagr': rng.choice([4.0, 5.0, 6.0, 7.0], count),
+        'monthly_savings': np.round(rng.uniform(0, 3000, count), -1),
+        'payout_amount': np.where(has_payout, np.round(rng.uniform(10000, 300000, count), -3), np.nan),
+        'payout_age': np.where(has_payout, np.minimum(PROJECTION_END_AGE, current_age + rng.integers(1, 30, count)), np.nan),
+    }
+
+
+def write_clients_csv(path: str, columns: Dict[str, np.ndarray]) -> None:
+    names = [name for name in TEXT_COLUMNS + INPUT_COLUMNS + PAYOUT_COLUMNS if name in columns]
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(names)
+        for row in zip(*(columns[name].tolist() for name in names)):
+            writer.writerow(['' if isinstance(value, float) and np.isnan(value) else value for value in row])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Retirement-readiness analytics across a client book.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    summarize_parser = subcommands.add_parser('summarize', help='summarize a client CSV')
+    summarize_parser.add_argument('csv', help='client table with one column per input field')
+    summarize_parser.add_argument('--group-by', default='', help=f'comma-separated: {", ".join(GROUP_COLUMNS)}')
+    summarize_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    summarize_parser.add_argument('--output', help='write the JSON summary here instead of stdout')
+    summarize_parser.add_argument(
+        '--exact-percentiles', action='store_true',
+        help='keep every KPI value for exact percentiles (memory grows with the book)',
+    )
+
+    generate_parser = subcommands.add_parser('generate', help='write a synthetic client CSV')
+    generate_parser.add_argument('count', type=int)
+    generate_parser.add_argument('csv')
+    generate_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        write_clients_csv(args.csv, generate_clients(args.count, args.seed))
+        return 0
+
+    group_by = [name.strip() for name in args.group_by.split(',') if name.strip()]
+    try:
+        summary = summarize_population(
+            read_clients_csv(args.csv, max(1, args.chunk_size)), group_by, exact_percentiles=args.exact_percentiles,
+        )
+    except (OSError, ValueError) as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(summary, handle, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Opt-in request profiling and a CLI to replay captured inputs under cProfile
+
+Profiling is off unless PROFILING_ENABLED is set. When on, a request is profiled
+if it sends the `X-Profile-Request: 1` header or is picked by PROFILE_SAMPLE_RATE.
+Each capture writes a cProfile stats file and a JSON sidecar with the plan ID
+and CAD inputs to PROFILE_DIR, so a slow plan can be replayed with:
+
+    python profiling.py replay instance/profiles/<capture>.json
+
+/api/calculate serves identical inputs from the plan store, so a capture with
+`cache_hit: true` only shows the SQLite read; replay it to profile the
+calculation itself.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, Any, Optional
+
+from flask import current_app, g, request
+
+from calculations import calculate_retirement_plan
+from currency import inputs_to_base_currency, parse_display_currency
+from models import RetirementInputs, validate_inputs
+from plan_store import PLAN_ID_PATTERN, PlanStore, compute_plan_id
+
+PROFILE_HEADER = 'X-Profile-Request'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def extract_cad_inputs(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Find the plan inputs in a calculate or chat payload, converted to CAD."""
+    plan_data = data.get('plan_data')
+    if isinstance(plan_data, dict) and isinstance(plan_data.get('inputs'), dict):
+        source = plan_data['inputs']
+        currency = plan_data.get('currency') or {}
+        currency_data = {'currency': currency.get('code'), 'currency_rate': currency.get('rate')}
+    else:
+        source = data
+        currency_data = data
+
+    if validate_inputs(source):
+        return None
+    try:
+        _, rate = parse_display_currency(currency_data)
+    except ValueError:
+        return None
+    return RetirementInputs.from_dict(inputs_to_base_currency(source, rate)).to_dict()
+
+
+def input_hash(inputs: Optional[Dict[str, Any]], plan_id: Optional[str] = None) -> str:
+    """Plan ID of the profiled inputs (or the plan ID that was sent), so captures match stored plans."""
+    if inputs is None:
+        return plan_id if isinstance(plan_id, str) and PLAN_ID_PATTERN.match(plan_id) else 'no-inputs'
+    return compute_plan_id(RetirementInputs.from_dict(inputs))
+
+
+def note_cache_hit(hit: bool) -> None:
+    """Record whether the current request was served from the plan store."""
+    g.profile_cache_hit = hit
+
+
+def should_profile() -> bool:
+    """Decide whether the current request is profiled."""
+    config = current_app.config
+    if not config.get('PROFILING_ENABLED'):
+        return False
+    if request.headers.get(PROFILE_HEADER) == '1':
+        return True
+    sample_rate = config.get('PROFILE_SAMPLE_RATE', 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def profiled(view):
+    """Profile a view when should_profile() says so; otherwise call it directly."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not should_profile():
+            return view(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        try:
+            capture_id = write_capture(profiler, view.__name__, elapsed, response.status_code)
+            response.headers[PROFILE_ID_HEADER] = capture_id
+        except OSError:
+            current_app.logger.exception('Unable to write request profile')
+        return response
+
+    return wrapper
+
+
+def write_capture(profiler: cProfile.Profile, route: str, elapsed: float, status_code: int) -> str:
+    """Write <capture>.prof and <capture>.json to PROFILE_DIR and return the capture ID."""
+    data = request.get_json(silent=True) or {}
+    inputs = extract_cad_inputs(data)
+    plan_id = data.get('plan_id')
+    digest = input_hash(inputs, plan_id)
+    timestamp = datetime.now(timezone.utc)
+    capture_id = f"{timestamp.strftime('%Y%m%dT%H%M%S%fZ')}-{route}-{digest}"
+
+    directory = current_app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, f'{capture_id}.prof'))
+    with open(os.path.join(directory, f'{capture_id}.json'), 'w') as handle:
+        json.dump({
+            'route': route,
+            'input_hash': digest,
+            'plan_id': plan_id,
+            'inputs': inputs,
+            'cache_hit': g.get('profile_cache_hit'),
+            'elapsed_seconds': elapsed,
+            'status_code': status_code,
+            'captured_at': timestamp.isoformat(),
+        }, handle, indent=2)
+    return capture_id
+
+
+def load_replay_inputs(capture_path: str, store_path: Optional[str] = None) -> RetirementInputs:
+    """Read the CAD inputs from a capture sidecar, falling back to the plan store by ID."""
+    with open(capture_path) as handle:
+        capture = json.load(handle)
+
+    inputs = capture.get('inputs')
+    if inputs is None and capture.get('plan_id') and store_path:
+        plan = PlanStore(store_path).get(capture['plan_id'])
+        inputs = plan['inputs'] if plan else None
+    if inputs is None:
+        raise ValueError(f'{capture_path} has no replayable inputs')
+    return RetirementInputs.from_dict(inputs)
+
+
+def replay(inputs: RetirementInputs, repeat: int = 1) -> pstats.Stats:
+    """Run calculate_retirement_plan under cProfile `repeat` times."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(repeat):
+        calculate_retirement_plan(inputs)
+    profiler.disable()
+    return pstats.Stats(profiler)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Replay a captured plan under cProfile.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    replay_parser = subcommands.add_parser('replay', help='profile calculate_retirement_plan for a capture')
+    replay_parser.add_argument('capture', help='capture .json sidecar written by a profiled request')
+    replay_parser.add_argument('--repeat', type=int, default=20, help='calculations to run (default: 20)')
+    replay_parser.add_argument('--sort', default='cumulative', help='pstats sort key (default: cumulative)')
+    replay_parser.add_argument('--limit', type=int, default=25, help='rows of stats to print (default: 25)')
+    replay_parser.add_argument('--output', help='also write the stats to this .prof file')
+    replay_parser.add_argument('--store', help='plan store path, for captures that only carry a plan_id')
+    args = parser.parse_args(argv)
+
+    try:
+        inputs = load_replay_inputs(args.capture, args.store)
+    except (OSError, ValueError) as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    stats = replay(inputs, max(1, args.repeat))
+    if args.output:
+        stats.dump_stats(args.output)
+    stats.sort_stats(args.sort).print_stats(args.limit)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
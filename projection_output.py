@@ -0,0 +1,164 @@
+"""
+Request options for trimming plan output: field selection, age windows and downsampling
+"""
+from typing import Dict, List, Any, FrozenSet, Optional, Sequence
+
+from calculations import PROJECTION_END_AGE
+
+# Always returned so clients can keep referencing the plan and its currency.
+ALWAYS_INCLUDED_FIELDS = ('plan_id', 'currency')
+
+
+class ProjectionOptions:
+    """Which parts of a plan a client wants back"""
+
+    def __init__(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        stride: Optional[int] = None,
+        max_points: Optional[int] = None,
+    ):
+        self.fields = frozenset(fields) if fields else None
+        self.min_age = min_age
+        self.max_age = max_age
+        self.stride = stride
+        self.max_points = max_points
+
+    @classmethod
+    def from_request(cls, data: Dict[str, Any]) -> 'ProjectionOptions':
+        """Read options from a JSON body or query string; raises ValueError on bad values."""
+        fields = data.get('fields')
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        elif fields is not None and not isinstance(fields, list):
+            raise ValueError('Fields must be a list or a comma-separated string')
+
+        def optional_int(name: str, minimum: int) -> Optional[int]:
+            value = data.get(name)
+            if value in (None, ''):
+                return None
+            try:
+                parsed = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'{name} must be an integer')
+            if parsed < minimum:
+                raise ValueError(f'{name} must be at least {minimum}')
+            return parsed
+
+        options = cls(
+            fields=fields,
+            min_age=optional_int('min_age', 0),
+            max_age=optional_int('max_age', 0),
+            stride=optional_int('stride', 1),
+            max_points=optional_int('max_points', 3),
+        )
+        if options.min_age is not None and options.max_age is not None and options.min_age > options.max_age:
+            raise ValueError('min_age must not exceed max_age')
+        return options
+
+    @property
+    def is_default(self) -> bool:
+        return (
+            self.fields is None
+            and self.min_age is None
+            and self.max_age is None
+            and self.stride is None
+            and self.max_points is None
+        )
+
+    @property
+    def wants_year_by_year(self) -> bool:
+        return self.fields is None or 'year_by_year' in self.fields
+
+    def include_ages(self, current_age: int, retirement_age: int) -> Optional[FrozenSet[int]]:
+        """
+        Ages whose rows must be materialized, or None for every year.
+
+        LTTB needs the whole window before it can choose points, so max_points
+        narrows the rows afterwards in shape_plan rather than here.
+        """
+        if not self.wants_year_by_year:
+            return frozenset()
+        if self.min_age is None and self.max_age is None and self.stride is None:
+            return None
+
+        start = max(current_age, self.min_age if self.min_age is not None else current_age)
+        end = min(PROJECTION_END_AGE, self.max_age if self.max_age is not None else PROJECTION_END_AGE)
+        if start > end:
+            return frozenset()
+
+        ages = set(range(start, end + 1, self.stride or 1))
+        ages.add(end)
+        if start <= retirement_age <= end:
+            ages.add(retirement_age)
+        return frozenset(ages)
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the series' shape."""
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        bucket_start = int(bucket * bucket_size) + 1
+        bucket_end = int((bucket + 1) * bucket_size) + 1
+
+        next_start = bucket_end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_span = range(next_start, next_end) if next_start < next_end else range(count - 1, count)
+        average_x = sum(xs[index] for index in next_span) / len(next_span)
+        average_y = sum(ys[index] for index in next_span) / len(next_span)
+
+        best_index = bucket_start
+        best_area = -1.0
+        for index in range(bucket_start, bucket_end):
+            area = abs(
+                (xs[previous] - average_x) * (ys[index] - ys[previous])
+                - (xs[previous] - xs[index]) * (average_y - ys[previous])
+            )
+            if area > best_area:
+                best_area = area
+                best_index = index
+        selected.append(best_index)
+        previous = best_index
+
+    selected.append(count - 1)
+    return selected
+
+
+def shape_plan(plan: Dict[str, Any], options: ProjectionOptions) -> Dict[str, Any]:
+    """Apply the age window, stride, LTTB downsample and field selection to a plan."""
+    if options.is_default:
+        return plan
+
+    shaped = dict(plan)
+    if options.wants_year_by_year and 'year_by_year' in plan:
+        inputs = plan.get('inputs') or {}
+        include_ages = options.include_ages(
+            int(inputs.get('current_age', 0)),
+            int(inputs.get('ideal_retirement_age', PROJECTION_END_AGE)),
+        )
+        rows = plan['year_by_year']
+        if include_ages is not None:
+            rows = [row for row in rows if row['age'] in include_ages]
+        if options.max_points is not None and len(rows) > options.max_points:
+            keep = lttb_indices(
+                [row['age'] for row in rows],
+                [row['total_net_worth'] for row in rows],
+                options.max_points,
+            )
+            rows = [rows[index] for index in keep]
+        shaped['year_by_year'] = rows
+
+    if options.fields is not None:
+        shaped = {
+            key: value for key, value in shaped.items()
+            if key in options.fields or key in ALWAYS_INCLUDED_FIELDS
+        }
+    return shaped
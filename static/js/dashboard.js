@@ -1,5 +1,4 @@
 let planData = null;
-let basePlanData = null;
 let charts = {};
 const CHAT_STORAGE_KEY = 'retirementChatHistory';
 const CURRENCY_STORAGE_KEY = 'retirementCurrencyPreferences';
@@ -20,6 +19,18 @@ const currencyElements = {
     label: null
 };
 let currencyMenuListenersBound = false;
+const LIVE_DEBOUNCE_MS = 30;
+const liveState = {
+    sessionId: null,
+    source: null,
+    seq: 0,
+    timer: null,
+    inFlight: false,
+    queuedInputs: null,
+    plan: null,
+    planSeq: 0,
+    commitPending: false
+};
 let chatHistory = [];
 let chatInitialized = false;
 let chatIsSending = false;
@@ -30,10 +41,11 @@ document.addEventListener('DOMContentLoaded', () => {
     initializeCurrencyControls();
     const storedData = sessionStorage.getItem('retirementPlan');
     if (storedData) {
-        basePlanData = JSON.parse(storedData);
-        refreshPlanUsingCurrency();
-        renderDashboard();
-        initializeChatAssistant();
+        planData = JSON.parse(storedData);
+        refreshPlanUsingCurrency().then(() => {
+            renderDashboard();
+            initializeChatAssistant();
+        });
     } else {
         // No data, redirect to welcome page
         window.location.href = '/';
@@ -102,6 +114,7 @@ function renderDashboard() {
         <div class="charts-section">
             <div class="chart-container">
                 <h2>Net Worth Projection to Age 100</h2>
+                ${renderLiveRetirementSlider()}
                 <div class="chart-wrapper">
                     <canvas id="netWorthChart"></canvas>
                 </div>
@@ -126,6 +139,7 @@ function renderDashboard() {
 
     // Render charts
     renderCharts();
+    bindLiveRetirementSlider();
 
     // Re-initialize chat if it was already initialized, or init relative to new DOM
     initializeChatAssistant();
@@ -578,34 +592,15 @@ function saveAndRecalculate() {
         monthly_savings: parseFloat(getSanitizedInputValue('edit_monthly_savings')),
         payouts: Array.isArray(planData.inputs.payouts) ? planData.inputs.payouts.map(payout => ({ ...payout })) : []
     };
-    const normalizedInputs = convertInputsToBaseCurrency(inputs);
 
     // Show loading
     document.getElementById('dashboardContent').innerHTML = '<div class="loading">Recalculating...</div>';
     closeEditModal();
 
-    // Recalculate
-    fetch('/api/calculate', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(normalizedInputs)
-    })
-        .then(response => {
-            if (!response.ok) {
-                return response.json().then(err => {
-                    throw new Error(err.error || 'Server error');
-                });
-            }
-            return response.json();
-        })
+    // Recalculate (inputs are in the display currency; the server converts them for the tax step)
+    requestPlanCalculation(inputs)
         .then(result => {
-            if (result.error) {
-                throw new Error(result.error);
-            }
-            basePlanData = result;
-            sessionStorage.setItem('retirementPlan', JSON.stringify(result));
+            setPlanData(result);
             refreshDashboardAfterCurrencyChange();
             if (chatInitialized) {
                 setChatStatus('Plan updated. Ask what changed.');
@@ -619,6 +614,181 @@ function saveAndRecalculate() {
         });
 }
 
+function renderLiveRetirementSlider() {
+    if (!planData || !planData.inputs || typeof EventSource === 'undefined') {
+        return '';
+    }
+    const currentAge = Number(planData.inputs.current_age);
+    const retirementAge = Number(planData.inputs.ideal_retirement_age);
+    return `
+        <div class="live-slider">
+            <label for="liveRetirementAge">Retirement age</label>
+            <input type="range" id="liveRetirementAge" min="${currentAge + 1}" max="100" step="1" value="${retirementAge}">
+            <output id="liveRetirementAgeValue" for="liveRetirementAge">${retirementAge}</output>
+        </div>
+    `;
+}
+
+function bindLiveRetirementSlider() {
+    const slider = document.getElementById('liveRetirementAge');
+    if (!slider) {
+        return;
+    }
+    slider.addEventListener('input', () => {
+        const output = document.getElementById('liveRetirementAgeValue');
+        if (output) {
+            output.textContent = slider.value;
+        }
+        if (!planData || !planData.inputs) {
+            return;
+        }
+        queueLiveRecalculation({
+            ...planData.inputs,
+            ideal_retirement_age: parseInt(slider.value, 10)
+        });
+    });
+    slider.addEventListener('change', () => {
+        liveState.commitPending = true;
+        commitLivePlanIfSettled();
+    });
+}
+
+function ensureLiveChannel() {
+    if (typeof EventSource === 'undefined') {
+        return false;
+    }
+    if (liveState.source) {
+        return true;
+    }
+    if (!liveState.sessionId) {
+        liveState.sessionId = window.crypto && window.crypto.randomUUID
+            ? window.crypto.randomUUID()
+            : `live-${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+    liveState.source = new EventSource(`/api/live/${liveState.sessionId}/events`);
+    liveState.source.addEventListener('plan', handleLiveUpdate);
+    liveState.source.addEventListener('error', event => {
+        if (event.data) {
+            console.warn('Live recalculation failed:', event.data);
+        }
+    });
+    return true;
+}
+
+function queueLiveRecalculation(inputs) {
+    if (!ensureLiveChannel()) {
+        return;
+    }
+    // Only the newest inputs matter; older queued edits are simply replaced.
+    liveState.queuedInputs = inputs;
+    clearTimeout(liveState.timer);
+    liveState.timer = setTimeout(flushLiveRecalculation, LIVE_DEBOUNCE_MS);
+}
+
+function flushLiveRecalculation() {
+    if (liveState.inFlight || !liveState.queuedInputs) {
+        return;
+    }
+    const inputs = liveState.queuedInputs;
+    liveState.queuedInputs = null;
+    liveState.seq += 1;
+    liveState.inFlight = true;
+
+    fetch(`/api/live/${liveState.sessionId}/inputs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ seq: liveState.seq, inputs, ...getCurrencyParams() })
+    })
+        .catch(error => console.warn('Live update not sent:', error))
+        .finally(() => {
+            liveState.inFlight = false;
+            flushLiveRecalculation();
+        });
+}
+
+function handleLiveUpdate(event) {
+    const update = JSON.parse(event.data);
+    // Every update must be applied: later diffs are relative to the previous one on this stream.
+    liveState.plan = applyPlanDiff(liveState.plan, update);
+    liveState.planSeq = update.seq;
+    if (update.seq < liveState.seq) {
+        return;
+    }
+    planData = liveState.plan;
+    updateChartsInPlace();
+    commitLivePlanIfSettled();
+}
+
+function applyPlanDiff(previous, update) {
+    if (update.full) {
+        return update.plan;
+    }
+    const plan = { ...previous };
+    (update.removed || []).forEach(key => delete plan[key]);
+    Object.assign(plan, update.changed);
+
+    const previousRows = Array.isArray(previous.year_by_year) ? previous.year_by_year : [];
+    const rows = previousRows.slice(0, update.year_by_year.length).map(row => ({ ...row }));
+    update.year_by_year.rows.forEach(([index, cells]) => {
+        if (index < rows.length) {
+            Object.assign(rows[index], cells);
+        } else {
+            rows.push({ ...cells });
+        }
+    });
+    plan.year_by_year = rows;
+    return plan;
+}
+
+function commitLivePlanIfSettled() {
+    const settled = liveState.plan
+        && liveState.planSeq === liveState.seq
+        && !liveState.queuedInputs
+        && !liveState.inFlight;
+    if (!liveState.commitPending || !settled) {
+        return;
+    }
+    liveState.commitPending = false;
+    // Live previews are not stored; save the settled inputs so the plan gets an ID again.
+    requestPlanCalculation(planData.inputs)
+        .then(result => {
+            setPlanData(result);
+            renderDashboard();
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            renderDashboard();
+        });
+}
+
+function updateChartsInPlace() {
+    if (!planData || !charts.netWorth || !charts.breakdown) {
+        renderCharts();
+        return;
+    }
+    const yearByYear = planData.year_by_year;
+    charts.netWorth.data.labels = yearByYear.map(y => y.year);
+    charts.netWorth.data.datasets[0].data = yearByYear.map(y => y.total_net_worth);
+    charts.netWorth.data.datasets[1].data = yearByYear.map(y => y.target_net_worth);
+    charts.netWorth.update('none');
+
+    charts.breakdown.data.datasets[0].data = [
+        Math.max(0, planData.projected_current_assets),
+        Math.max(0, planData.projected_savings),
+        Math.max(0, planData.projected_payouts)
+    ];
+    charts.breakdown.update('none');
+
+    const summaryValues = document.querySelectorAll('.summary-cards .summary-card .value');
+    if (summaryValues.length === 3) {
+        summaryValues[0].textContent = formatCurrency(planData.target_net_worth);
+        summaryValues[1].textContent = formatCurrency(planData.total_projected_net_worth);
+        summaryValues[2].textContent = formatCurrency(planData.gap);
+        summaryValues[2].classList.toggle('positive', planData.gap >= 0);
+        summaryValues[2].classList.toggle('negative', planData.gap < 0);
+    }
+}
+
 function formatCurrency(amount) {
     const numericValue = typeof amount === 'number' ? amount : parseFloat(amount);
     const value = Number.isFinite(numericValue) ? numericValue : 0;
@@ -737,7 +907,7 @@ function triggerAIAnalysis() {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
             message: analysisPrompt,
-            plan_data: planData
+            ...getChatPlanPayload()
         })
     })
         .then(response => response.json())
@@ -765,6 +935,14 @@ function triggerAIAnalysis() {
 
 
 
+function getChatPlanPayload() {
+    if (planData && planData.plan_id) {
+        const currency = getPlanCurrency(planData);
+        return { plan_id: planData.plan_id, currency: currency.code, currency_rate: currency.rate };
+    }
+    return { plan_data: planData };
+}
+
 function renderChatMessages() {
     if (!chatElements.messages) {
         return;
@@ -831,7 +1009,7 @@ function handleChatSubmit(event) {
         },
         body: JSON.stringify({
             message,
-            plan_data: planData
+            ...getChatPlanPayload()
         })
     })
         .then(response => response.json())
@@ -1075,20 +1253,29 @@ function updateCurrencyRateUI() {
 }
 
 function refreshDashboardAfterCurrencyChange() {
-    if (!basePlanData) {
+    if (!planData) {
         return;
     }
-    refreshPlanUsingCurrency();
-    renderDashboard();
-    refreshEditFormIfOpen();
+    refreshPlanUsingCurrency().then(() => {
+        renderDashboard();
+        refreshEditFormIfOpen();
+    });
 }
 
 function refreshPlanUsingCurrency() {
-    if (!basePlanData) {
-        planData = null;
-        return;
+    if (!planData) {
+        return Promise.resolve();
     }
-    planData = convertPlanData(basePlanData, getCurrentCurrencyRate());
+    return loadPlanInCurrency(planData)
+        .then(setPlanData)
+        .catch(error => {
+            console.warn('Unable to convert plan currency', error);
+            // Keep showing the plan in the currency it was calculated in.
+            const currency = getPlanCurrency(planData);
+            currencyState.selected = currencyConfig[currency.code] ? currency.code : 'CAD';
+            currencyState.rates[currencyState.selected] = currency.rate;
+            updateCurrencyRateUI();
+        });
 }
 
 function refreshEditFormIfOpen() {
@@ -1098,104 +1285,67 @@ function refreshEditFormIfOpen() {
     }
 }
 
-function convertPlanData(sourcePlan, rate) {
-    if (!sourcePlan) {
-        return null;
-    }
-    const safeRate = Number.isFinite(rate) && rate > 0 ? rate : 1;
-    const converted = JSON.parse(JSON.stringify(sourcePlan));
-
-    convertNumericFields(converted, [
-        'target_net_worth',
-        'projected_current_assets',
-        'projected_savings',
-        'projected_payouts',
-        'total_projected_net_worth',
-        'net_worth_at_projection_end',
-        'gap',
-        'required_monthly_savings',
-        'current_monthly_savings',
-        'pre_tax_retirement_income',
-        'max_sustainable_monthly_income',
-        'max_sustainable_pre_tax_monthly_income'
-    ], safeRate);
-
-    if (Array.isArray(converted.year_by_year)) {
-        converted.year_by_year = converted.year_by_year.map(entry => {
-            const updatedEntry = { ...entry };
-            convertNumericFields(updatedEntry, [
-                'current_assets',
-                'savings_contributions',
-                'payouts_value',
-                'total_net_worth',
-                'target_net_worth',
-                'gap'
-            ], safeRate);
-            return updatedEntry;
-        });
-    }
+function getCurrencyParams() {
+    return {
+        currency: currencyState.selected,
+        currency_rate: getCurrentCurrencyRate()
+    };
+}
 
-    if (converted.inputs) {
-        convertNumericFields(converted.inputs, [
-            'ideal_retirement_income',
-            'current_asset_values',
-            'monthly_savings'
-        ], safeRate);
+function getPlanCurrency(plan) {
+    // Plans saved before currency metadata existed are in CAD.
+    return plan && plan.currency ? plan.currency : { code: 'CAD', rate: 1 };
+}
 
-        if (Array.isArray(converted.inputs.payouts)) {
-            converted.inputs.payouts = converted.inputs.payouts.map(payout => {
-                const payoutClone = { ...payout };
-                const amount = parseFloat(payoutClone.amount);
-                if (Number.isFinite(amount)) {
-                    payoutClone.amount = amount * safeRate;
-                }
-                return payoutClone;
-            });
-        }
+function loadPlanInCurrency(plan) {
+    const current = getPlanCurrency(plan);
+    const target = getCurrencyParams();
+    if (current.code === target.currency && current.rate === target.currency_rate) {
+        return Promise.resolve(plan);
     }
-
-    return converted;
+    if (plan.plan_id) {
+        // Stored plans are rescaled server-side; no new simulation is run.
+        const query = new URLSearchParams(target).toString();
+        return requestPlan(`/api/plans/${encodeURIComponent(plan.plan_id)}?${query}`);
+    }
+    return requestPlan('/api/calculate', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...plan.inputs, currency: current.code, currency_rate: current.rate })
+    }).then(loadPlanInCurrency);
 }
 
-function convertNumericFields(target, fields, rate) {
-    if (!target || !Array.isArray(fields)) {
-        return;
-    }
-    fields.forEach(field => {
-        if (typeof target[field] === 'number') {
-            target[field] = target[field] * rate;
-        } else if (typeof target[field] === 'string') {
-            const parsed = parseFloat(target[field]);
-            if (Number.isFinite(parsed)) {
-                target[field] = parsed * rate;
-            }
-        }
+function requestPlanCalculation(inputs) {
+    return requestPlan('/api/calculate', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ ...inputs, ...getCurrencyParams() })
     });
 }
 
-function convertInputsToBaseCurrency(inputs) {
-    const rate = getCurrentCurrencyRate();
-    if (!Number.isFinite(rate) || rate <= 0 || rate === 1) {
-        return inputs;
-    }
-    const normalized = { ...inputs };
-    ['ideal_retirement_income', 'current_asset_values', 'monthly_savings'].forEach(field => {
-        const parsed = parseFloat(normalized[field]);
-        if (Number.isFinite(parsed)) {
-            normalized[field] = parsed / rate;
-        }
-    });
-    normalized.payouts = Array.isArray(inputs.payouts)
-        ? inputs.payouts.map(payout => {
-            const payoutClone = { ...payout };
-            const amount = parseFloat(payoutClone.amount);
-            if (Number.isFinite(amount)) {
-                payoutClone.amount = amount / rate;
+function requestPlan(url, options) {
+    return fetch(url, options)
+        .then(response => {
+            if (!response.ok) {
+                return response.json().then(err => {
+                    throw new Error(err.error || 'Server error');
+                });
             }
-            return payoutClone;
+            return response.json();
         })
-        : [];
-    return normalized;
+        .then(result => {
+            if (result.error) {
+                throw new Error(result.error);
+            }
+            return result;
+        });
+}
+
+function setPlanData(plan) {
+    planData = plan;
+    sessionStorage.setItem('retirementPlan', JSON.stringify(plan));
 }
 
 function getCurrentCurrencyRate() {
@@ -0,0 +1,132 @@
+"""
+OpenAI-compatible stub server for load tests
+
+Serves /v1/chat/completions (plain and `stream: true`) and /v1/models with a
+canned reply and configurable latency, so /api/chat can be loaded without
+calling OpenAI. Point the app at it with:
+
+    python stub_llm.py --port 8001 --latency 0.8 --tokens-per-second 40
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python app.py
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+DEFAULT_MODEL = 'stub-model'
+DEFAULT_REPLY = (
+    "You're close to your goal, with a small gap to close before retirement.\n"
+    "- Your projected savings reach **$1.2M** at retirement.\n"
+    "- Adding **$300/month** would close the remaining gap.\n"
+    "- Retiring two years later has a similar effect."
+)
+
+
+def create_app(
+    latency: float = 0.8,
+    jitter: float = 0.2,
+    tokens_per_second: float = 40.0,
+    reply: str = DEFAULT_REPLY,
+    model: str = DEFAULT_MODEL,
+    seed=None,
+) -> Flask:
+    """
+    Build the stub app.
+
+    Each completion waits `latency` seconds (plus or minus up to `jitter`) before
+    the first token, then emits the reply at `tokens_per_second` (0 for instant).
+    """
+    stub = Flask(__name__)
+    rng = random.Random(seed)
+    tokens = re.findall(r'\S+\s*', reply) or ['']
+    token_delay = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    def first_token_delay() -> float:
+        return max(0.0, latency + rng.uniform(-jitter, jitter))
+
+    def usage(messages) -> dict:
+        prompt_tokens = sum(len(str(message.get('content', '')).split()) for message in messages)
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(tokens),
+            'total_tokens': prompt_tokens + len(tokens),
+        }
+
+    @stub.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(silent=True) or {}
+        model_name = body.get('model') or model
+        messages = body.get('messages') or []
+        completion_id = f'chatcmpl-stub-{uuid.uuid4().hex}'
+        created = int(time.time())
+
+        if body.get('stream'):
+            def chunk(delta, finish_reason=None):
+                payload = {
+                    'id': completion_id,
+                    'object': 'chat.completion.chunk',
+                    'created': created,
+                    'model': model_name,
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+                }
+                return f'data: {json.dumps(payload)}\n\n'
+
+            def generate():
+                time.sleep(first_token_delay())
+                yield chunk({'role': 'assistant', 'content': ''})
+                for token in tokens:
+                    if token_delay:
+                        time.sleep(token_delay)
+                    yield chunk({'content': token})
+                yield chunk({}, 'stop')
+                yield 'data: [DONE]\n\n'
+
+            return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+        time.sleep(first_token_delay() + token_delay * len(tokens))
+        return jsonify({
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': created,
+            'model': model_name,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                'finish_reason': 'stop',
+            }],
+            'usage': usage(messages),
+        })
+
+    @stub.route('/v1/models', methods=['GET'])
+    def models():
+        return jsonify({
+            'object': 'list',
+            'data': [{'id': model, 'object': 'model', 'created': 0, 'owned_by': 'stub'}],
+        })
+
+    return stub
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run an OpenAI-compatible stub for load tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.8, help='seconds before the first token (default: 0.8)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='+/- seconds of random latency (default: 0.2)')
+    parser.add_argument('--tokens-per-second', type=float, default=40.0, help='reply speed, 0 for instant (default: 40)')
+    parser.add_argument('--reply', default=DEFAULT_REPLY, help='canned assistant reply')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='model name reported by /v1/models')
+    args = parser.parse_args(argv)
+
+    stub = create_app(args.latency, args.jitter, args.tokens_per_second, args.reply, args.model)
+    stub.run(host=args.host, port=args.port, threaded=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@
 Canadian Tax Calculator for Retirement Income
 Uses 2024 federal and provincial tax brackets (Ontario as default)
 """
+import numpy as np
 
 # 2024 Federal Tax Brackets (Canada)
 FEDERAL_BRACKETS = [
@@ -121,3 +122,57 @@ def calculate_pre_tax_income_needed(after_tax_income: float) -> float:
         guess += difference / (1 - calculate_canadian_tax_rate(guess))
     
     return guess
+
+def calculate_tax_array(incomes, brackets: list, basic_personal_amount: float) -> np.ndarray:
+    """Element-wise calculate_tax for an array of incomes."""
+    incomes = np.asarray(incomes, dtype=float)
+    tax = np.zeros_like(incomes)
+    for min_income, max_income, rate in brackets:
+        bracket_income = np.where(incomes > min_income, np.minimum(incomes, max_income) - min_income, 0.0)
+        tax = tax + bracket_income * rate
+
+    lowest_rate = brackets[0][2]
+    basic_personal_credit = basic_personal_amount * lowest_rate
+    return np.where(incomes <= 0, 0.0, np.maximum(0.0, tax - basic_personal_credit))
+
+def calculate_canadian_tax_rate_array(annual_incomes) -> np.ndarray:
+    """Element-wise calculate_canadian_tax_rate for an array of incomes."""
+    annual_incomes = np.asarray(annual_incomes, dtype=float)
+    federal_tax = calculate_tax_array(annual_incomes, FEDERAL_BRACKETS, FEDERAL_BASIC_PERSONAL_AMOUNT)
+    ontario_tax = calculate_tax_array(annual_incomes, ONTARIO_BRACKETS, ONTARIO_BASIC_PERSONAL_AMOUNT)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective_rate = (federal_tax + ontario_tax) / annual_incomes
+    return np.where(annual_incomes <= 0, 0.0, np.minimum(effective_rate, 1.0))
+
+def calculate_after_tax_income_array(annual_incomes) -> np.ndarray:
+    """Element-wise calculate_after_tax_income for an array of incomes."""
+    annual_incomes = np.asarray(annual_incomes, dtype=float)
+    after_tax = annual_incomes * (1 - calculate_canadian_tax_rate_array(annual_incomes))
+    return np.where(annual_incomes <= 0, 0.0, after_tax)
+
+def calculate_pre_tax_income_needed_array(after_tax_incomes) -> np.ndarray:
+    """
+    Element-wise calculate_pre_tax_income_needed for an array of after-tax incomes.
+
+    Each element follows the same iteration as the scalar version and stops
+    updating once it is within $1.
+    """
+    after_tax_incomes = np.asarray(after_tax_incomes, dtype=float)
+    guess = after_tax_incomes / 0.75
+    done = after_tax_incomes <= 0
+    result = np.zeros_like(after_tax_incomes)
+
+    for _ in range(10):  # Max 10 iterations
+        calculated_after_tax = calculate_after_tax_income_array(guess)
+        converged = ~done & (np.abs(calculated_after_tax - after_tax_incomes) < 1.0)
+        result[converged] = guess[converged]
+        done |= converged
+        if done.all():
+            return result
+        difference = after_tax_incomes - calculated_after_tax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            adjusted = guess + difference / (1 - calculate_canadian_tax_rate_array(guess))
+        guess = np.where(done, guess, adjusted)
+
+    result[~done] = guess[~done]
+    return result
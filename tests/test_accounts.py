@@ -0,0 +1,131 @@
+import unittest
+
+import numpy as np
+
+from accounts import Account, calculate_bucket_projection, project_accounts, simulate_buckets, withdrawal_cost
+from calculations import calculate_retirement_plan, calculate_year_by_year_projection
+from models import RetirementInputs
+
+
+def make_inputs(**overrides):
+    payload = {
+        'ideal_retirement_income': 5000,
+        'ideal_retirement_age': 65,
+        'withdrawal_rate': 4,
+        'current_age': 40,
+        'current_asset_values': 200000,
+        'cagr': 5,
+        'monthly_savings': 1500,
+        'payouts': [{'amount': 80000, 'year': 72}, {'amount': 10000, 'year': 72}, {'amount': 5000, 'year': 50}],
+    }
+    payload.update(overrides)
+    return RetirementInputs.from_dict(payload)
+
+
+class BucketKernelTests(unittest.TestCase):
+    def test_legacy_accounts_reproduce_three_bucket_plan(self):
+        for overrides in ({}, {'current_asset_values': 0, 'ideal_retirement_income': 20000}, {'cagr': -3}):
+            inputs = make_inputs(**overrides)
+            expected = calculate_retirement_plan(inputs)
+            actual = calculate_retirement_plan(inputs, projection=calculate_bucket_projection)
+            self.assertEqual(actual, expected, overrides)
+
+        windowed = calculate_retirement_plan(
+            make_inputs(), include_ages=frozenset({50, 80}), projection=calculate_bucket_projection,
+        )
+        self.assertEqual([row['age'] for row in windowed['year_by_year']], [50, 80])
+
+    def test_year_end_balances_are_collected_only_on_request(self):
+        inputs = make_inputs()
+        args = (inputs, 1_000_000.0, 6000.0, 0.04, frozenset())
+        self.assertNotIn('year_end_balances', calculate_year_by_year_projection(*args))
+
+        scalar, array = [], []
+        calculate_year_by_year_projection(*args, year_end_balances=scalar)
+        calculate_bucket_projection(*args, year_end_balances=array)
+        full = calculate_year_by_year_projection(*args[:4])['projections']
+
+        self.assertEqual(array, scalar)
+        self.assertEqual(scalar, [(row['current_assets'], row['savings_contributions'], row['payouts_value']) for row in full])
+
+    def test_accounts_drain_in_priority_order(self):
+        projection = project_accounts(
+            [
+                Account('rrsp', balance=10000, withdrawal_priority=2),
+                Account('tfsa', balance=1200, withdrawal_priority=1),
+                Account('non_registered', balance=1200, withdrawal_priority=0),
+            ],
+            current_age=60,
+            retirement_age=61,
+            monthly_withdrawal=100,
+        )
+        self.assertEqual(projection['accounts'], ['non_registered', 'tfsa', 'rrsp'])
+        balances = {age: list(row) for age, row in zip(projection['ages'], projection['balances'])}
+        self.assertEqual(balances[61], [1200, 1200, 10000])
+        self.assertEqual(balances[62], [0, 1200, 10000])
+        self.assertEqual(balances[63], [0, 0, 10000])
+        self.assertEqual(balances[64], [0, 0, 8800])
+        self.assertEqual(list(projection['retirement_balances']), [1200, 1200, 10000])
+        self.assertAlmostEqual(projection['depletion_age'], 71 + 5 / 12)
+
+    def test_tax_free_withdrawals_cost_fewer_gross_dollars(self):
+        self.assertEqual(withdrawal_cost(1.0, 0.25), 1.0)
+        self.assertAlmostEqual(withdrawal_cost(0.0, 0.25), 0.75)
+
+        projection = project_accounts(
+            [Account('tfsa', balance=750, taxable_fraction=0.0), Account('rrsp', balance=1000, withdrawal_priority=1)],
+            current_age=64,
+            retirement_age=65,
+            monthly_withdrawal=100,
+            tax_rate=0.25,
+        )
+        balances = dict(zip(projection['ages'], projection['balances'].tolist()))
+        self.assertAlmostEqual(balances[66][0], 0.0)
+        # 750 covers all 10 months of the TFSA (100 * 0.75); the RRSP pays the other 2 in full.
+        self.assertAlmostEqual(balances[66][1], 800.0)
+
+    def test_contribution_schedule_and_deposits(self):
+        projection = project_accounts(
+            [
+                Account('rrsp', monthly_contribution=100, contribution_start_age=45, contribution_end_age=50),
+                Account('tfsa', monthly_contribution=50, deposits=[(42, 1000.0), (42, 500.0)], withdrawal_priority=1),
+            ],
+            current_age=40,
+            retirement_age=60,
+            monthly_withdrawal=0,
+        )
+        balances = dict(zip(projection['ages'], projection['balances'].tolist()))
+        self.assertEqual(balances[45][0], 0.0)
+        self.assertEqual(balances[50][0], 6000.0)
+        self.assertEqual(balances[55][0], 6000.0)
+        self.assertEqual(balances[60][1], 50 * 240 + 1500.0)
+
+    def test_scenarios_are_simulated_independently(self):
+        def run(rows):
+            rows = np.array(rows, dtype=float)
+            return simulate_buckets(
+                balances=rows[:, 0:2],
+                monthly_contributions=rows[:, 2:4],
+                contribution_start_months=np.zeros((len(rows), 2)),
+                contribution_end_months=rows[:, [4, 4]],
+                pre_retirement_rates=np.full((len(rows), 2), 0.004),
+                post_retirement_rates=np.full((len(rows), 2), 0.002),
+                withdrawal_costs=np.ones((len(rows), 2)),
+                monthly_withdrawals=rows[:, 5],
+                retirement_months=rows[:, 4].astype(int),
+                horizon_months=rows[:, 6].astype(int),
+                deposits={},
+            )
+
+        scenarios = [[1000, 50000, 100, 200, 120, 3000, 480], [0, 10000, 0, 500, 240, 1000, 600]]
+        together = run(scenarios)
+        for index, scenario in enumerate(scenarios):
+            alone = run([scenario])
+            years = int(scenario[6]) // 12 + 1
+            np.testing.assert_array_equal(together['year_end_balances'][index, :years], alone['year_end_balances'][0])
+            np.testing.assert_array_equal(together['end_balances'][index], alone['end_balances'][0])
+            np.testing.assert_array_equal(together['depletion_months'][index], alone['depletion_months'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from annuity_factors import clear_cache, factor_arrays, factors_for, monthly_rate
+from calculations import calculate_retirement_plan
+from models import RetirementInputs
+
+
+class AnnuityFactorTests(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+
+    def test_factors_match_closed_form(self):
+        factors = factors_for(0.05, 300)
+        rate = (1.05) ** (1 / 12) - 1
+        self.assertEqual(factors.monthly_rate, rate)
+        self.assertEqual(factors.growth_factor, (1 + rate) ** 300)
+        self.assertEqual(factors.annuity_factor, ((1 + rate) ** 300 - 1) / rate)
+        self.assertEqual(factors.annuity_due_factor, ((1 + rate) ** 300 - 1) / rate * (1 + rate))
+
+    def test_zero_rate_uses_linear_limit_and_rates_are_floored(self):
+        factors = factors_for(0.0, 120)
+        self.assertEqual((factors.monthly_rate, factors.growth_factor), (0.0, 1.0))
+        self.assertEqual((factors.annuity_factor, factors.annuity_due_factor), (120.0, 120.0))
+        self.assertEqual(monthly_rate(-5.0), monthly_rate(-0.999999))
+
+    def test_repeated_plans_reuse_cached_factors(self):
+        inputs = RetirementInputs.from_dict({
+            'ideal_retirement_income': 5000,
+            'ideal_retirement_age': 65,
+            'withdrawal_rate': 4,
+            'current_age': 40,
+            'current_asset_values': 10000,
+            'cagr': 5,
+            'monthly_savings': 500,
+            'payouts': [],
+        })
+        calculate_retirement_plan(inputs)
+        misses = factors_for.cache_info().misses
+        calculate_retirement_plan(inputs)
+        self.assertEqual(factors_for.cache_info().misses, misses)
+        self.assertGreater(factors_for.cache_info().hits, 0)
+
+    def test_arrays_match_scalar_factors(self):
+        rates = np.array([[-2.0], [0.0], [0.03], [0.07]])
+        months = np.array([0, 12, 360, 780])
+        arrays = factor_arrays(rates, months)
+        self.assertEqual(arrays.growth_factor.shape, (4, 4))
+        for row, rate in enumerate(rates[:, 0]):
+            for column, month in enumerate(months):
+                expected = factors_for(float(rate), int(month))
+                for field, value in expected._asdict().items():
+                    np.testing.assert_allclose(
+                        getattr(arrays, field)[row, column], value, rtol=1e-12, atol=1e-15, err_msg=field,
+                    )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import tracemalloc
+import unittest
+from unittest import mock
+
+from app import app
+from batch import iter_results, iter_scenarios, to_ndjson
+from calculations import calculate_retirement_plan
+from models import RetirementInputs
+from projection_output import ProjectionOptions
+
+BASE = {
+    'ideal_retirement_income': 5000,
+    'ideal_retirement_age': 65,
+    'withdrawal_rate': 4,
+    'current_age': 40,
+    'current_asset_values': 200000,
+    'cagr': 5,
+    'monthly_savings': 1500,
+    'payouts': [],
+}
+
+
+def peak_streaming_memory(scenario_count):
+    data = {'base': BASE, 'grid': {'monthly_savings': list(range(scenario_count))}}
+    lines = to_ndjson(iter_results(iter_scenarios(data), ProjectionOptions(), ('CAD', 1.0)))
+    tracemalloc.start()
+    try:
+        for _ in lines:
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class BatchTests(unittest.TestCase):
+    def test_grid_expands_lazily_in_row_major_order(self):
+        scenarios = iter_scenarios({
+            'base': BASE,
+            'grid': {'ideal_retirement_age': [60, 65], 'cagr': [3, 5, 7]},
+        })
+        first_three = [next(scenarios) for _ in range(3)]
+        self.assertEqual([(s['ideal_retirement_age'], s['cagr']) for s in first_three], [(60, 3), (60, 5), (60, 7)])
+
+    def test_grid_size_is_checked_before_streaming(self):
+        with self.assertRaises(ValueError):
+            iter_scenarios({'base': BASE, 'grid': {'cagr': list(range(200)), 'monthly_savings': list(range(100))}})
+        with self.assertRaises(ValueError):
+            iter_scenarios({'grid': {'cagr': [1]}})
+
+    def test_results_match_single_plan_and_report_errors_inline(self):
+        items = list(iter_results(
+            [BASE, {**BASE, 'current_age': 120}, 'bad'],
+            ProjectionOptions(),
+            ('CAD', 1.0),
+        ))
+
+        expected = calculate_retirement_plan(RetirementInputs.from_dict(BASE))
+        self.assertEqual(items[0]['index'], 0)
+        self.assertEqual(items[0]['result']['year_by_year'], expected['year_by_year'])
+        self.assertIn('Current age', items[1]['error'])
+        self.assertEqual(items[2], {'index': 2, 'error': 'Scenario must be an object'})
+
+    def test_calculation_failure_is_reported_and_stream_continues(self):
+        def calculate(inputs, include_ages=None):
+            if inputs.monthly_savings == 1:
+                raise OverflowError('math range error')
+            return calculate_retirement_plan(inputs, include_ages)
+
+        with mock.patch('batch.calculate_retirement_plan', side_effect=calculate):
+            items = list(iter_results(
+                [BASE, {**BASE, 'monthly_savings': 1}, BASE],
+                ProjectionOptions(),
+                ('CAD', 1.0),
+            ))
+
+        self.assertEqual(items[1], {'index': 1, 'error': 'math range error'})
+        self.assertEqual([item['index'] for item in items], [0, 1, 2])
+        self.assertIn('result', items[2])
+
+    def test_peak_memory_does_not_grow_with_scenario_count(self):
+        small = peak_streaming_memory(10)
+        large = peak_streaming_memory(100)
+        self.assertLess(large, small * 2)
+
+
+class BatchApiTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_ndjson_stream_from_grid(self):
+        response = self.client.post('/api/calculate/batch', json={
+            'base': BASE,
+            'grid': {'ideal_retirement_age': [60, 65, 70]},
+            'fields': ['gap'],
+        })
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertEqual(set(lines[0]['result']), {'gap', 'currency'})
+
+    def test_json_array_format_and_ndjson_body(self):
+        body = json.dumps(BASE) + '\n\nnot json\n' + json.dumps({**BASE, 'cagr': 7}) + '\n'
+        response = self.client.post(
+            '/api/calculate/batch?format=json&fields=target_net_worth',
+            data=body,
+            content_type='application/x-ndjson',
+        )
+        items = response.get_json()
+
+        self.assertEqual(len(items), 3)
+        self.assertIn('target_net_worth', items[0]['result'])
+        self.assertIn('error', items[1])
+        self.assertIn('result', items[2])
+
+    def test_invalid_requests_are_rejected_up_front(self):
+        self.assertEqual(self.client.post('/api/calculate/batch', json={'scenarios': {}}).status_code, 400)
+        self.assertEqual(self.client.post('/api/calculate/batch?format=csv', json={'scenarios': []}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
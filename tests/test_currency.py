@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from app import app
+from calculations import calculate_retirement_plan
+from currency import convert_plan, inputs_to_base_currency, parse_display_currency
+from models import RetirementInputs
+
+
+class CurrencyConversionTests(unittest.TestCase):
+    def make_payload(self, **overrides):
+        payload = {
+            'ideal_retirement_income': 7400,
+            'ideal_retirement_age': 65,
+            'withdrawal_rate': 4,
+            'current_age': 40,
+            'current_asset_values': 148000,
+            'cagr': 5,
+            'monthly_savings': 1110,
+            'payouts': [{'amount': 37000, 'year': 60}],
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_display_currency_defaults_to_cad(self):
+        self.assertEqual(parse_display_currency({}), ('CAD', 1.0))
+        self.assertEqual(parse_display_currency({'currency': 'usd', 'currency_rate': '0.74'}), ('USD', 0.74))
+        with self.assertRaises(ValueError):
+            parse_display_currency({'currency_rate': 0})
+
+    def test_display_currency_requires_a_rate_outside_cad(self):
+        self.assertEqual(parse_display_currency({'currency': 'cad'}), ('CAD', 1.0))
+        with self.assertRaises(ValueError):
+            parse_display_currency({'currency': 'USD'})
+        with self.assertRaises(ValueError):
+            parse_display_currency({'currency': 'USD', 'currency_rate': ''})
+
+    def test_display_currency_code_must_be_three_letters(self):
+        for code in ('US', 'USDX', 'U$D', '123'):
+            with self.assertRaises(ValueError, msg=code):
+                parse_display_currency({'currency': code, 'currency_rate': 0.74})
+
+    def test_tax_is_applied_in_base_currency(self):
+        rate = 0.74
+        display_payload = self.make_payload()
+        base_inputs = RetirementInputs.from_dict(inputs_to_base_currency(display_payload, rate))
+        converted = convert_plan(calculate_retirement_plan(base_inputs), 'USD', rate)
+
+        self.assertAlmostEqual(base_inputs.ideal_retirement_income, 10000)
+        self.assertAlmostEqual(converted['inputs']['ideal_retirement_income'], 7400)
+        self.assertAlmostEqual(converted['inputs']['payouts'][0]['amount'], 37000)
+
+        # Running the tax step on display-currency amounts would understate the rate.
+        naive = calculate_retirement_plan(RetirementInputs.from_dict(display_payload))
+        self.assertGreater(converted['retirement_tax_rate'], naive['retirement_tax_rate'])
+
+    def test_conversion_scales_money_fields_only(self):
+        plan = calculate_retirement_plan(RetirementInputs.from_dict(self.make_payload()))
+        converted = convert_plan(plan, 'GBP', 0.5)
+
+        self.assertEqual(converted['currency'], {'code': 'GBP', 'rate': 0.5})
+        self.assertAlmostEqual(converted['gap'], plan['gap'] * 0.5)
+        self.assertEqual(converted['gap_percentage'], plan['gap_percentage'])
+        self.assertEqual(converted['retirement_tax_rate'], plan['retirement_tax_rate'])
+        self.assertEqual(converted['year_by_year'][3]['age'], plan['year_by_year'][3]['age'])
+        self.assertAlmostEqual(
+            converted['year_by_year'][3]['total_net_worth'],
+            plan['year_by_year'][3]['total_net_worth'] * 0.5,
+        )
+        self.assertNotIn('currency', plan)
+
+
+class CurrencyApiTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.previous_path = app.config['PLAN_STORE_PATH']
+        app.config['PLAN_STORE_PATH'] = os.path.join(self.tmpdir.name, 'plans.sqlite3')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['PLAN_STORE_PATH'] = self.previous_path
+        self.tmpdir.cleanup()
+
+    def test_currency_switch_rescales_stored_plan(self):
+        payload = {
+            'ideal_retirement_income': 5000,
+            'ideal_retirement_age': 65,
+            'withdrawal_rate': 4,
+            'current_age': 45,
+            'current_asset_values': 150000,
+            'cagr': 6,
+            'monthly_savings': 1200,
+            'payouts': [],
+        }
+        base = self.client.post('/api/calculate', json=payload).get_json()
+        self.assertEqual(base['currency'], {'code': 'CAD', 'rate': 1})
+
+        usd = self.client.get(f"/api/plans/{base['plan_id']}?currency=USD&currency_rate=0.74").get_json()
+        self.assertEqual(usd['plan_id'], base['plan_id'])
+        self.assertAlmostEqual(usd['target_net_worth'], base['target_net_worth'] * 0.74)
+        self.assertAlmostEqual(usd['inputs']['ideal_retirement_income'], 3700)
+
+        response = self.client.get(f"/api/plans/{base['plan_id']}?currency_rate=-1")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f"/api/plans/{base['plan_id']}?currency=USD")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
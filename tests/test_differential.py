@@ -0,0 +1,300 @@
+"""
+Differential tests: every registered engine must match the frozen reference engine.
+
+Register a faster implementation by adding an Engine to ENGINES; any callable left
+as None is simply not checked. Speedup ratios against the reference are written to
+stderr at the end of the run (visible with `python -m unittest` or `pytest -s`).
+"""
+import functools
+import math
+import sys
+import time
+import unittest
+
+import numpy as np
+
+try:
+    from hypothesis import HealthCheck, given, settings, strategies as st
+except ImportError:  # Fallback only; hypothesis is pinned in requirements-dev.txt
+    raise unittest.SkipTest('hypothesis is not installed (pip install -r requirements-dev.txt)')
+
+import accounts
+import calculations
+import population
+import reference_engine
+import tax_calculator
+from models import RetirementInputs, validate_inputs
+
+REL_TOL = 1e-9
+ABS_TOL = 1e-6
+# Float noise can move the first negative balance by at most one month.
+DEPLETION_AGE_TOL = 1 / 12 + 1e-9
+TIMING_SAMPLE_SIZE = 40
+# Plan fields reported by population.calculate_population_kpis.
+POPULATION_KPIS = (
+    'target_net_worth',
+    'total_projected_net_worth',
+    'gap',
+    'gap_percentage',
+    'required_monthly_savings',
+    'net_worth_at_projection_end',
+    'depletion_age',
+    'retirement_tax_rate',
+    'pre_tax_retirement_income',
+    'max_sustainable_monthly_income',
+    'income_goal_coverage_ratio',
+)
+
+
+class Engine:
+    """Candidate implementations of the reference functions"""
+
+    def __init__(
+        self,
+        retirement_plan=None,
+        required_balance=None,
+        sustainable_withdrawal=None,
+        monthly_savings=None,
+        pre_tax_income=None,
+        plan_kpis=None,
+    ):
+        self.retirement_plan = retirement_plan
+        self.required_balance = required_balance
+        self.sustainable_withdrawal = sustainable_withdrawal
+        self.monthly_savings = monthly_savings
+        self.pre_tax_income = pre_tax_income
+        self.plan_kpis = plan_kpis
+
+
+def one_element(array_function):
+    """Call an element-wise array function on scalars, as one-element arrays."""
+    @functools.wraps(array_function)
+    def call(*args):
+        return float(array_function(*(np.array([arg]) for arg in args))[0])
+    return call
+
+
+def population_kpis(payload):
+    """calculate_population_kpis for a single client payload (at most one payout)."""
+    columns = {name: np.array([float(payload[name])]) for name in population.INPUT_COLUMNS}
+    payout = payload['payouts'][0] if payload['payouts'] else {'amount': math.nan, 'year': math.nan}
+    columns['payout_amount'] = np.array([float(payout['amount'])])
+    columns['payout_age'] = np.array([float(payout['year'])])
+    kpis = population.calculate_population_kpis(columns)
+    return {name: None if np.isnan(values[0]) else float(values[0]) for name, values in kpis.items()}
+
+
+def reference_plan_kpis(payload):
+    """The reference plan restricted to the KPIs calculate_population_kpis reports."""
+    plan = reference_engine.calculate_retirement_plan(RetirementInputs.from_dict(payload))
+    return {name: plan[name] for name in POPULATION_KPIS}
+
+
+ENGINES = {
+    'calculations': Engine(
+        retirement_plan=calculations.calculate_retirement_plan,
+        required_balance=calculations.calculate_required_retirement_balance,
+        sustainable_withdrawal=calculations.calculate_sustainable_monthly_withdrawal,
+        monthly_savings=calculations.project_monthly_savings,
+        pre_tax_income=tax_calculator.calculate_pre_tax_income_needed,
+    ),
+    'bucket_kernel': Engine(
+        retirement_plan=functools.partial(
+            calculations.calculate_retirement_plan,
+            projection=accounts.calculate_bucket_projection,
+        ),
+    ),
+    'array_helpers': Engine(
+        required_balance=one_element(calculations.calculate_required_retirement_balance_array),
+        sustainable_withdrawal=one_element(calculations.calculate_sustainable_monthly_withdrawal_array),
+        pre_tax_income=one_element(tax_calculator.calculate_pre_tax_income_needed_array),
+    ),
+    'population_kpis': Engine(plan_kpis=population_kpis),
+}
+
+REFERENCE = Engine(
+    retirement_plan=reference_engine.calculate_retirement_plan,
+    required_balance=reference_engine.calculate_required_retirement_balance,
+    sustainable_withdrawal=reference_engine.calculate_sustainable_monthly_withdrawal,
+    monthly_savings=reference_engine.project_monthly_savings,
+    pre_tax_income=reference_engine.calculate_pre_tax_income_needed,
+    plan_kpis=reference_plan_kpis,
+)
+
+
+def money(max_value):
+    return st.one_of(
+        st.sampled_from([0.0, 0.01, max_value]),
+        st.floats(min_value=0, max_value=max_value, allow_nan=False, allow_infinity=False),
+    )
+
+
+@st.composite
+def plan_payloads(draw, max_payouts=300):
+    current_age = draw(st.one_of(st.sampled_from([0, 18, 64, 98, 99]), st.integers(0, 99)))
+    retirement_age = draw(st.one_of(
+        st.sampled_from([current_age + 1, 100]),
+        st.integers(current_age + 1, 100),
+    ))
+    payout = st.fixed_dictionaries({
+        'amount': money(5_000_000),
+        'year': st.integers(current_age + 1, 100),
+    })
+    payouts = draw(st.one_of(
+        st.lists(payout, max_size=min(5, max_payouts)),
+        st.lists(payout, min_size=min(100, max_payouts), max_size=max_payouts),
+    ))
+    payload = {
+        'ideal_retirement_income': draw(st.floats(min_value=1, max_value=50_000)),
+        'ideal_retirement_age': retirement_age,
+        'withdrawal_rate': draw(st.one_of(st.sampled_from([0.01, 4.0, 100.0]), st.floats(0.01, 100))),
+        'current_age': current_age,
+        'current_asset_values': draw(money(10_000_000)),
+        'cagr': draw(st.one_of(
+            st.sampled_from([-100.0, -99.9, -5.0, 0.0, 1e-10, -1e-10, 100.0]),
+            st.floats(-100, 100),
+        )),
+        'monthly_savings': draw(money(50_000)),
+        'payouts': payouts,
+    }
+    assert validate_inputs(payload) == []
+    return payload
+
+
+def assert_close(testcase, expected, actual, path='result'):
+    """Recursively compare two results with float tolerance."""
+    if isinstance(expected, dict):
+        testcase.assertEqual(set(expected), set(actual), path)
+        for key in expected:
+            if key == 'depletion_age' and expected[key] is not None and actual[key] is not None:
+                testcase.assertLessEqual(abs(expected[key] - actual[key]), DEPLETION_AGE_TOL, path)
+                continue
+            assert_close(testcase, expected[key], actual[key], f'{path}.{key}')
+    elif isinstance(expected, list):
+        testcase.assertEqual(len(expected), len(actual), path)
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            assert_close(testcase, left, right, f'{path}[{index}]')
+    elif isinstance(expected, float) or isinstance(actual, float):
+        testcase.assertTrue(
+            math.isclose(expected, actual, rel_tol=REL_TOL, abs_tol=ABS_TOL),
+            f'{path}: expected {expected!r}, got {actual!r}',
+        )
+    else:
+        testcase.assertEqual(expected, actual, path)
+
+
+def best_time(function, arguments, repeat=3):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in arguments:
+            function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class DifferentialEngineTests(unittest.TestCase):
+    samples = {
+        'retirement_plan': [],
+        'required_balance': [],
+        'sustainable_withdrawal': [],
+        'monthly_savings': [],
+        'pre_tax_income': [],
+        'plan_kpis': [],
+    }
+
+    @classmethod
+    def engines_for(cls, function_name):
+        return [
+            (name, getattr(engine, function_name))
+            for name, engine in ENGINES.items()
+            if getattr(engine, function_name) is not None
+        ]
+
+    @classmethod
+    def record_sample(cls, function_name, args):
+        if len(cls.samples[function_name]) < TIMING_SAMPLE_SIZE:
+            cls.samples[function_name].append(args)
+
+    @settings(max_examples=100, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+    @given(plan_payloads())
+    def test_retirement_plan_matches_reference(self, payload):
+        expected = REFERENCE.retirement_plan(RetirementInputs.from_dict(payload))
+        self.record_sample('retirement_plan', (RetirementInputs.from_dict(payload),))
+        for name, retirement_plan in self.engines_for('retirement_plan'):
+            actual = retirement_plan(RetirementInputs.from_dict(payload))
+            assert_close(self, expected, actual, name)
+
+    @settings(max_examples=100, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+    @given(plan_payloads(max_payouts=1))
+    def test_plan_kpis_match_reference(self, payload):
+        # calculate_population_kpis takes one payout column per client.
+        expected = REFERENCE.plan_kpis(payload)
+        self.record_sample('plan_kpis', (payload,))
+        for name, plan_kpis in self.engines_for('plan_kpis'):
+            assert_close(self, expected, plan_kpis(payload), name)
+
+    @settings(max_examples=300, deadline=None)
+    @given(
+        st.floats(min_value=-1000, max_value=1_000_000),
+        st.one_of(st.sampled_from([-1.0, -0.999999, 0.0, 1e-13, -1e-13]), st.floats(-1.5, 1.0)),
+        st.integers(-12, 1200),
+    )
+    def test_required_balance_matches_reference(self, withdrawal, annual_return, months):
+        args = (withdrawal, annual_return, months)
+        expected = REFERENCE.required_balance(*args)
+        self.record_sample('required_balance', args)
+        for name, required_balance in self.engines_for('required_balance'):
+            assert_close(self, expected, required_balance(*args), name)
+
+    @settings(max_examples=300, deadline=None)
+    @given(
+        st.floats(min_value=-1000, max_value=10_000_000),
+        st.one_of(st.sampled_from([-1.0, 0.0, 1e-13, 0.04]), st.floats(-1.5, 1.0)),
+        st.integers(-12, 1200),
+    )
+    def test_sustainable_withdrawal_matches_reference(self, balance, annual_return, months):
+        args = (balance, annual_return, months)
+        expected = REFERENCE.sustainable_withdrawal(*args)
+        self.record_sample('sustainable_withdrawal', args)
+        for name, sustainable_withdrawal in self.engines_for('sustainable_withdrawal'):
+            assert_close(self, expected, sustainable_withdrawal(*args), name)
+
+    @settings(max_examples=300, deadline=None)
+    @given(
+        st.floats(min_value=-1000, max_value=50_000),
+        st.one_of(st.sampled_from([-1.0, 0.0, 1e-13, 0.05]), st.floats(-1.5, 1.0)),
+        st.integers(-12, 1200),
+    )
+    def test_monthly_savings_matches_reference(self, savings, cagr, months):
+        args = (savings, cagr, months)
+        expected = REFERENCE.monthly_savings(*args)
+        self.record_sample('monthly_savings', args)
+        for name, monthly_savings in self.engines_for('monthly_savings'):
+            assert_close(self, expected, monthly_savings(*args), name)
+
+    @settings(max_examples=300, deadline=None)
+    @given(st.one_of(st.sampled_from([0.0, 1.0, 55867.0, 246752.0]), st.floats(-100, 2_000_000)))
+    def test_pre_tax_income_matches_reference(self, after_tax_income):
+        expected = REFERENCE.pre_tax_income(after_tax_income)
+        self.record_sample('pre_tax_income', (after_tax_income,))
+        for name, pre_tax_income in self.engines_for('pre_tax_income'):
+            assert_close(self, expected, pre_tax_income(after_tax_income), name)
+
+    @classmethod
+    def tearDownClass(cls):
+        lines = []
+        for function_name, arguments in cls.samples.items():
+            if not arguments:
+                continue
+            reference_time = best_time(getattr(REFERENCE, function_name), arguments)
+            for name, function in cls.engines_for(function_name):
+                engine_time = best_time(function, arguments)
+                ratio = reference_time / engine_time if engine_time > 0 else math.inf
+                lines.append(f'  {function_name:<22} {name:<16} {ratio:6.2f}x ({len(arguments)} samples)')
+        if lines:
+            sys.stderr.write('\nSpeedup vs reference engine:\n' + '\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import unittest
+
+from app import app
+from calculations import calculate_retirement_plan
+from live_recalc import LiveRecalcHub, apply_plan_diff, diff_plan
+from models import RetirementInputs
+
+
+def make_inputs(**overrides):
+    payload = {
+        'ideal_retirement_income': 5000,
+        'ideal_retirement_age': 65,
+        'withdrawal_rate': 4,
+        'current_age': 40,
+        'current_asset_values': 200000,
+        'cagr': 5,
+        'monthly_savings': 1500,
+        'payouts': [],
+    }
+    payload.update(overrides)
+    return RetirementInputs.from_dict(payload)
+
+
+class PlanDiffTests(unittest.TestCase):
+    def test_diff_round_trips_between_plans(self):
+        before = calculate_retirement_plan(make_inputs())
+        after = calculate_retirement_plan(make_inputs(ideal_retirement_age=60))
+
+        update = diff_plan(before, after)
+
+        self.assertFalse(update['full'])
+        self.assertNotIn('projection_end_age', update['changed'])
+        self.assertEqual(apply_plan_diff(before, update), after)
+
+    def test_diff_handles_shorter_and_longer_projections(self):
+        short = calculate_retirement_plan(make_inputs(current_age=60))
+        long = calculate_retirement_plan(make_inputs(current_age=30))
+
+        self.assertEqual(apply_plan_diff(short, diff_plan(short, long)), long)
+        self.assertEqual(apply_plan_diff(long, diff_plan(long, short)), short)
+
+    def test_first_update_is_full(self):
+        plan = calculate_retirement_plan(make_inputs())
+        update = diff_plan(None, plan)
+        self.assertTrue(update['full'])
+        self.assertEqual(apply_plan_diff(None, update), plan)
+
+
+class LiveRecalcHubTests(unittest.TestCase):
+    def test_pending_edits_are_coalesced(self):
+        calculated_ages = []
+
+        def calculate(inputs):
+            calculated_ages.append(inputs.ideal_retirement_age)
+            return calculate_retirement_plan(inputs)
+
+        hub = LiveRecalcHub(calculate=calculate)
+        for seq, age in enumerate((61, 62, 63), start=1):
+            self.assertTrue(hub.submit('session-1', seq, make_inputs(ideal_retirement_age=age)))
+
+        update = hub.next_update('session-1', timeout=0.1)
+
+        self.assertEqual(update['seq'], 3)
+        self.assertEqual(calculated_ages, [63])
+        self.assertIsNone(hub.next_update('session-1', timeout=0.01))
+
+    def test_out_of_order_submissions_are_rejected(self):
+        hub = LiveRecalcHub()
+        self.assertTrue(hub.submit('session-1', 5, make_inputs()))
+        self.assertFalse(hub.submit('session-1', 4, make_inputs()))
+
+    def test_result_superseded_during_calculation_is_dropped(self):
+        hub = LiveRecalcHub()
+        calculated_ages = []
+
+        def calculate(inputs):
+            calculated_ages.append(inputs.ideal_retirement_age)
+            if len(calculated_ages) == 1:
+                hub.submit('session-1', 2, make_inputs(ideal_retirement_age=70))
+            return calculate_retirement_plan(inputs)
+
+        hub.calculate = calculate
+        hub.submit('session-1', 1, make_inputs(ideal_retirement_age=60))
+        update = hub.next_update('session-1', timeout=0.1)
+
+        self.assertEqual(calculated_ages, [60, 70])
+        self.assertEqual(update['seq'], 2)
+        self.assertEqual(update['plan']['inputs']['ideal_retirement_age'], 70)
+
+    def test_later_updates_are_diffs_against_the_last_sent_plan(self):
+        hub = LiveRecalcHub()
+        stream = hub.open_stream('session-1')
+        hub.submit('session-1', 1, make_inputs(ideal_retirement_age=60))
+        first = hub.next_update('session-1', timeout=0.1, stream=stream)
+        hub.submit('session-1', 2, make_inputs(ideal_retirement_age=61))
+        second = hub.next_update('session-1', timeout=0.1, stream=stream)
+
+        self.assertTrue(first['full'])
+        self.assertFalse(second['full'])
+        expected = calculate_retirement_plan(make_inputs(ideal_retirement_age=61))
+        self.assertEqual(apply_plan_diff(first['plan'], second), expected)
+
+    def test_reconnected_stream_starts_from_a_full_plan(self):
+        hub = LiveRecalcHub()
+        stream_a = hub.events('session-1', keepalive=0.05)
+        self.assertEqual(next(stream_a), 'retry: 1000\n\n')
+        hub.submit('session-1', 1, make_inputs(ideal_retirement_age=60))
+        self.assertIn('"full":true', next(stream_a))
+
+        stream_b = hub.events('session-1', keepalive=0.05)
+        self.assertEqual(next(stream_b), 'retry: 1000\n\n')
+        hub.submit('session-1', 2, make_inputs(ideal_retirement_age=61))
+        # The superseded stream ends without consuming the pending inputs.
+        self.assertEqual(list(stream_a), [])
+        hub.submit('session-1', 3, make_inputs(ideal_retirement_age=62))
+
+        event = next(stream_b)
+        update = json.loads(event.split('data: ', 1)[1])
+        expected = calculate_retirement_plan(make_inputs(ideal_retirement_age=62))
+        self.assertEqual(update['seq'], 3)
+        self.assertTrue(update['full'])
+        self.assertEqual(apply_plan_diff(None, update), expected)
+        stream_b.close()
+
+
+class LiveRecalcApiTests(unittest.TestCase):
+    def test_inputs_endpoint_validates_requests(self):
+        client = app.test_client()
+        valid_inputs = make_inputs().to_dict()
+
+        self.assertEqual(client.post('/api/live/bad!/inputs', json={}).status_code, 400)
+        self.assertEqual(client.post('/api/live/session-api/inputs', json={'seq': 1, 'inputs': {}}).status_code, 400)
+        for body in ([1], 'text', {'seq': 1, 'inputs': [1]}):
+            response = client.post('/api/live/session-api/inputs', json=body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('error', response.get_json())
+        response = client.post('/api/live/session-api/inputs', data='not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = client.post('/api/live/session-api/inputs', json={'seq': 1, 'inputs': valid_inputs})
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.get_json()['accepted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from werkzeug.serving import make_server
+
+import loadtest
+import stub_llm
+from app import app, get_openai_client
+
+
+class StubLlmTests(unittest.TestCase):
+    def setUp(self):
+        self.client = stub_llm.create_app(latency=0, jitter=0, tokens_per_second=0, reply='Hello there friend').test_client()
+
+    def test_plain_completion(self):
+        body = self.client.post('/v1/chat/completions', json={
+            'model': 'gpt-test',
+            'messages': [{'role': 'user', 'content': 'hi'}],
+        }).get_json()
+        self.assertEqual(body['object'], 'chat.completion')
+        self.assertEqual(body['model'], 'gpt-test')
+        self.assertEqual(body['choices'][0]['message']['content'], 'Hello there friend')
+        self.assertEqual(body['usage']['completion_tokens'], 3)
+
+    def test_streamed_completion(self):
+        response = self.client.post('/v1/chat/completions', json={'messages': [], 'stream': True})
+        events = [line[len('data: '):] for line in response.get_data(as_text=True).splitlines() if line]
+        self.assertEqual(events[-1], '[DONE]')
+        chunks = [json.loads(event) for event in events[:-1]]
+        self.assertEqual(''.join(chunk['choices'][0]['delta'].get('content', '') for chunk in chunks), 'Hello there friend')
+        self.assertEqual(chunks[-1]['choices'][0]['finish_reason'], 'stop')
+
+    def test_openai_client_honours_base_url(self):
+        with mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'stub', 'OPENAI_BASE_URL': 'http://127.0.0.1:8001/v1'}):
+            self.assertEqual(str(get_openai_client().base_url), 'http://127.0.0.1:8001/v1/')
+
+
+class LoadTestReportTests(unittest.TestCase):
+    def test_percentiles_and_summary(self):
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(loadtest.percentile(values, 0.5), 0.05)
+        self.assertEqual(loadtest.percentile(values, 0.99), 0.099)
+
+        recorder = loadtest.Recorder()
+        for value in values:
+            recorder.record('POST /api/calculate', value, True)
+        recorder.record('POST /api/calculate', 5.0, False)
+        stats = recorder.summary(elapsed_seconds=10)['POST /api/calculate']
+        self.assertEqual((stats['count'], stats['errors'], stats['rps']), (100, 1, 10.0))
+        self.assertAlmostEqual(stats['p95_ms'], 95.0)
+
+    def test_saturation_is_first_stage_without_throughput_gain(self):
+        stages = [{'concurrency': c, 'rps': rps} for c, rps in ((1, 10), (2, 19), (4, 36), (8, 38), (16, 37))]
+        self.assertEqual(loadtest.find_saturation(stages)['concurrency'], 8)
+        self.assertIsNone(loadtest.find_saturation(stages[:3]))
+
+    def test_parse_mix(self):
+        self.assertEqual(loadtest.parse_mix('chat=1, recalculate=3'), {'chat': 1.0, 'recalculate': 3.0})
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix('delete_everything=1')
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix('chat=0')
+
+
+class LoadTestRunTests(unittest.TestCase):
+    def serve(self, wsgi_app):
+        server = make_server('127.0.0.1', 0, wsgi_app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        return f'http://127.0.0.1:{server.server_port}'
+
+    def test_stage_against_app_and_stub(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        previous_path = app.config['PLAN_STORE_PATH']
+        app.config['PLAN_STORE_PATH'] = os.path.join(tmpdir.name, 'plans.sqlite3')
+        self.addCleanup(app.config.__setitem__, 'PLAN_STORE_PATH', previous_path)
+
+        stub_url = self.serve(stub_llm.create_app(latency=0.01, jitter=0, tokens_per_second=0))
+        app_url = self.serve(app)
+        with mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'stub', 'OPENAI_BASE_URL': f'{stub_url}/v1'}):
+            stage = asyncio.run(loadtest.run_stage(app_url, 2, 1.0, loadtest.DEFAULT_MIX, seed=1))
+
+        self.assertEqual(stage['errors'], 0)
+        self.assertGreater(stage['requests'], 0)
+        self.assertIn(loadtest.CALCULATE_ROUTE, stage['routes'])
+        self.assertIn(loadtest.CHAT_ROUTE, stage['routes'])
+        for stats in stage['routes'].values():
+            self.assertEqual(stats['errors'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
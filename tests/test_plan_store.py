@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app import app
+import calculations
+from calculations import calculate_retirement_plan
+from models import RetirementInputs
+from plan_store import PlanStore, compute_plan_id
+from projection_output import ProjectionOptions
+
+
+class PlanStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = PlanStore(os.path.join(self.tmpdir.name, 'plans.sqlite3'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_payload(self, **overrides):
+        payload = {
+            'ideal_retirement_income': 5000,
+            'ideal_retirement_age': 65,
+            'withdrawal_rate': 4,
+            'current_age': 40,
+            'current_asset_values': 200000,
+            'cagr': 5,
+            'monthly_savings': 1500,
+            'payouts': [{'amount': 50000, 'year': 70}, {'amount': 20000, 'year': 55}],
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_plan_id_ignores_payout_order_and_numeric_formatting(self):
+        first = RetirementInputs.from_dict(self.make_payload())
+        second = RetirementInputs.from_dict(self.make_payload(
+            ideal_retirement_income='5000.0',
+            payouts=[{'amount': '20000', 'year': '55'}, {'amount': 50000.0, 'year': 70}],
+        ))
+        third = RetirementInputs.from_dict(self.make_payload(monthly_savings=1501))
+
+        self.assertEqual(compute_plan_id(first), compute_plan_id(second))
+        self.assertNotEqual(compute_plan_id(first), compute_plan_id(third))
+
+    def test_stored_plan_round_trips_exactly(self):
+        inputs = RetirementInputs.from_dict(self.make_payload())
+        expected = calculate_retirement_plan(RetirementInputs.from_dict(self.make_payload()))
+
+        plan_id = self.store.put(inputs, expected)
+        loaded = self.store.get(plan_id)
+
+        self.assertEqual(loaded['plan_id'], plan_id)
+        self.assertEqual(loaded['year_by_year'], expected['year_by_year'])
+        for key, value in expected.items():
+            if key not in ('year_by_year', 'inputs'):
+                self.assertEqual(loaded[key], value, key)
+
+    def test_kpi_only_miss_skips_rows_but_stores_every_year(self):
+        expected = calculate_retirement_plan(RetirementInputs.from_dict(self.make_payload()))
+
+        with mock.patch('calculations.make_projection_row', wraps=calculations.make_projection_row) as make_row:
+            result = self.store.get_or_calculate(
+                RetirementInputs.from_dict(self.make_payload()),
+                ProjectionOptions(fields=['gap', 'target_net_worth']),
+            )
+
+        # Only the retirement and projection-end snapshots are built.
+        self.assertEqual(make_row.call_count, 2)
+        self.assertEqual(result['year_by_year'], [])
+        self.assertEqual(result['gap'], expected['gap'])
+        self.assertEqual(self.store.get(result['plan_id'])['year_by_year'], expected['year_by_year'])
+
+    def test_identical_inputs_are_stored_once(self):
+        first = self.store.get_or_calculate(RetirementInputs.from_dict(self.make_payload()))
+        second = self.store.get_or_calculate(RetirementInputs.from_dict(self.make_payload(
+            payouts=list(reversed(self.make_payload()['payouts'])),
+        )))
+
+        self.assertEqual(first['plan_id'], second['plan_id'])
+        self.assertEqual(first['year_by_year'], second['year_by_year'])
+        self.assertEqual(self.store.count(), 1)
+
+    def test_missing_plan_returns_none(self):
+        self.assertIsNone(self.store.get('does-not-exist'))
+
+
+class PlanStoreApiTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.previous_path = app.config['PLAN_STORE_PATH']
+        app.config['PLAN_STORE_PATH'] = os.path.join(self.tmpdir.name, 'plans.sqlite3')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['PLAN_STORE_PATH'] = self.previous_path
+        self.tmpdir.cleanup()
+
+    def test_calculate_returns_plan_id_that_can_be_fetched(self):
+        payload = {
+            'ideal_retirement_income': 4000,
+            'ideal_retirement_age': 65,
+            'withdrawal_rate': 4,
+            'current_age': 45,
+            'current_asset_values': 150000,
+            'cagr': 6,
+            'monthly_savings': 1200,
+            'payouts': [],
+        }
+        calculated = self.client.post('/api/calculate', json=payload).get_json()
+        self.assertIn('plan_id', calculated)
+
+        fetched = self.client.get(f"/api/plans/{calculated['plan_id']}")
+        self.assertEqual(fetched.status_code, 200)
+        self.assertEqual(fetched.get_json()['year_by_year'], calculated['year_by_year'])
+
+    def test_unknown_plan_id_is_rejected(self):
+        self.assertEqual(self.client.get('/api/plans/unknown').status_code, 404)
+        response = self.client.post('/api/chat', json={'message': 'Hi', 'plan_id': 'unknown'})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
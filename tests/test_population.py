@@ -0,0 +1,146 @@
+import json
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import population
+from calculations import calculate_retirement_plan
+from models import RetirementInputs
+from tax_calculator import calculate_pre_tax_income_needed, calculate_pre_tax_income_needed_array
+
+
+def scalar_plan(columns, index):
+    payload = {name: float(columns[name][index]) for name in population.INPUT_COLUMNS}
+    amount = columns['payout_amount'][index]
+    payload['payouts'] = [] if np.isnan(amount) else [
+        {'amount': float(amount), 'year': int(columns['payout_age'][index])},
+    ]
+    return calculate_retirement_plan(RetirementInputs.from_dict(payload), include_ages=frozenset())
+
+
+class PopulationKpiTests(unittest.TestCase):
+    def test_kpis_match_calculate_retirement_plan(self):
+        columns = population.generate_clients(300, seed=3)
+        kpis = population.calculate_population_kpis(columns)
+        for index in range(300):
+            plan = scalar_plan(columns, index)
+            for name, values in kpis.items():
+                expected = plan[name]
+                if expected is None:
+                    self.assertTrue(np.isnan(values[index]), (index, name))
+                else:
+                    self.assertTrue(
+                        math.isclose(values[index], expected, rel_tol=1e-9, abs_tol=1e-6),
+                        f'{name}[{index}]: expected {expected!r}, got {values[index]!r}',
+                    )
+
+    def test_vectorized_tax_matches_scalar(self):
+        incomes = np.array([-5.0, 0.0, 1.0, 55867.0, 246752.0, 80000.0, 2_500_000.0])
+        expected = [calculate_pre_tax_income_needed(float(income)) for income in incomes]
+        self.assertEqual(calculate_pre_tax_income_needed_array(incomes).tolist(), expected)
+
+    def test_invalid_rows_are_counted_and_skipped(self):
+        columns = population.generate_clients(20, seed=1)
+        columns['current_age'][0] = 120
+        columns['ideal_retirement_income'][1] = np.nan
+        columns['payout_amount'][2], columns['payout_age'][2] = 1000.0, columns['current_age'][2]
+
+        summary = population.summarize_population(population.iter_chunks(columns, 7))
+        self.assertEqual((summary['clients'], summary['invalid_rows']), (17, 3))
+        self.assertEqual(summary['overall']['clients'], 17)
+
+
+class PopulationSummaryTests(unittest.TestCase):
+    def test_group_statistics_match_per_client_plans(self):
+        columns = population.generate_clients(400, seed=7)
+        summary = population.summarize_population(
+            population.iter_chunks(columns, 150), group_by=['province', 'age_band'], exact_percentiles=True,
+        )
+        bands = population.age_bands(columns['current_age'])
+        plans = [scalar_plan(columns, index) for index in range(400)]
+
+        self.assertEqual(sum(group['clients'] for group in summary['groups']), 400)
+        for group in summary['groups']:
+            rows = [
+                index for index in range(400)
+                if columns['province'][index] == group['province'] and bands[index] == group['age_band']
+            ]
+            self.assertEqual(group['clients'], len(rows))
+            gaps = [plans[index]['gap'] for index in rows]
+            self.assertAlmostEqual(group['on_track_share'], sum(gap >= 0 for gap in gaps) / len(rows))
+            self.assertAlmostEqual(group['metrics']['gap']['p50'], float(np.percentile(gaps, 50)), places=4)
+            depletion_ages = [plans[index]['depletion_age'] for index in rows if plans[index]['depletion_age']]
+            self.assertEqual(sum(item['clients'] for item in group['depletion_age_histogram']), len(depletion_ages))
+
+    def test_grouped_overall_matches_ungrouped_summary(self):
+        columns = population.generate_clients(300, seed=3)
+        grouped = population.summarize_population(population.iter_chunks(columns, 100), group_by=['province'])
+        ungrouped = population.summarize_population(population.iter_chunks(columns, 100))
+
+        self.assertEqual(grouped['overall']['clients'], 300)
+        self.assertEqual(grouped['overall']['depletion_age_histogram'], ungrouped['overall']['depletion_age_histogram'])
+        for metric, stats in ungrouped['overall']['metrics'].items():
+            for name, value in stats.items():
+                if value is None:
+                    self.assertIsNone(grouped['overall']['metrics'][metric][name])
+                else:
+                    self.assertTrue(math.isclose(grouped['overall']['metrics'][metric][name], value, rel_tol=1e-9))
+
+    def test_sketch_percentiles_are_within_relative_accuracy(self):
+        rng = np.random.default_rng(5)
+        values = np.concatenate((
+            -rng.lognormal(10, 2, 4000), rng.lognormal(12, 1.5, 6000), np.zeros(100), [np.nan],
+        ))
+        sketch = population.QuantileSketch()
+        for chunk in np.array_split(rng.permutation(values), 7):
+            sketch.add(chunk)
+
+        finite = values[~np.isnan(values)]
+        self.assertEqual(sketch.count, len(finite))
+        self.assertEqual((sketch.min, sketch.max), (finite.min(), finite.max()))
+        for p, estimate in zip(population.PERCENTILES, sketch.percentiles(population.PERCENTILES)):
+            lower, upper = np.percentile(finite, p, method='lower'), np.percentile(finite, p, method='higher')
+            tolerance = population.SKETCH_RELATIVE_ACCURACY * max(abs(lower), abs(upper))
+            self.assertGreaterEqual(estimate, min(lower, upper) - tolerance, p)
+            self.assertLessEqual(estimate, max(lower, upper) + tolerance, p)
+
+    def test_sketch_summary_tracks_exact_percentiles(self):
+        columns = population.generate_clients(2000, seed=6)
+        sketched = population.summarize_population(population.iter_chunks(columns, 500))['overall']['metrics']
+        exact = population.summarize_population(
+            population.iter_chunks(columns, 500), exact_percentiles=True,
+        )['overall']['metrics']
+
+        for metric in ('total_projected_net_worth', 'required_monthly_savings', 'depletion_age'):
+            self.assertEqual(sketched[metric]['count'], exact[metric]['count'])
+            for p in population.PERCENTILES:
+                self.assertTrue(math.isclose(sketched[metric][f'p{p}'], exact[metric][f'p{p}'], rel_tol=0.03), (metric, p))
+
+    def test_unknown_group_column_is_rejected(self):
+        with self.assertRaises(ValueError):
+            population.PopulationSummary(group_by=['postcode'])
+
+    def test_csv_round_trip_through_cli(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, 'clients.csv')
+            output_path = os.path.join(tmpdir, 'summary.json')
+            self.assertEqual(population.main(['generate', '250', csv_path, '--seed', '2']), 0)
+            self.assertEqual(population.main([
+                'summarize', csv_path, '--group-by', 'age_band', '--chunk-size', '100', '--output', output_path,
+            ]), 0)
+            with open(output_path) as handle:
+                summary = json.load(handle)
+
+        in_memory = population.summarize_population(
+            population.iter_chunks(population.generate_clients(250, seed=2), 100), group_by=['age_band'],
+        )
+        self.assertEqual(summary['clients'], 250)
+        self.assertEqual(summary['overall']['metrics'], in_memory['overall']['metrics'])
+        self.assertEqual([group['age_band'] for group in summary['groups']], [group['age_band'] for group in in_memory['groups']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from app import app
+from profiling import load_replay_inputs, main
+
+
+class ProfilingTests(unittest.TestCase):
+    payload = {
+        'ideal_retirement_income': 4000,
+        'ideal_retirement_age': 65,
+        'withdrawal_rate': 4,
+        'current_age': 18,
+        'current_asset_values': 10000,
+        'cagr': 6,
+        'monthly_savings': 800,
+        'payouts': [{'amount': 1000, 'year': age} for age in range(19, 100)],
+    }
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.previous_config = {
+            key: app.config[key]
+            for key in ('PLAN_STORE_PATH', 'PROFILING_ENABLED', 'PROFILE_SAMPLE_RATE', 'PROFILE_DIR')
+        }
+        app.config['PLAN_STORE_PATH'] = os.path.join(self.tmpdir.name, 'plans.sqlite3')
+        app.config['PROFILE_DIR'] = os.path.join(self.tmpdir.name, 'profiles')
+        app.config['PROFILE_SAMPLE_RATE'] = 0.0
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config.update(self.previous_config)
+        self.tmpdir.cleanup()
+
+    def captures(self):
+        directory = app.config['PROFILE_DIR']
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def test_header_is_ignored_when_profiling_is_disabled(self):
+        app.config['PROFILING_ENABLED'] = False
+        response = self.client.post('/api/calculate', json=self.payload, headers={'X-Profile-Request': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(self.captures(), [])
+
+    def test_header_captures_profile_that_can_be_replayed(self):
+        app.config['PROFILING_ENABLED'] = True
+        self.assertNotIn('X-Profile-Id', self.client.post('/api/calculate', json=self.payload).headers)
+
+        response = self.client.post('/api/calculate', json=self.payload, headers={'X-Profile-Request': '1'})
+        capture_id = response.headers['X-Profile-Id']
+
+        self.assertEqual(self.captures(), [f'{capture_id}.json', f'{capture_id}.prof'])
+        sidecar = os.path.join(app.config['PROFILE_DIR'], f'{capture_id}.json')
+        with open(sidecar) as handle:
+            capture = json.load(handle)
+        self.assertEqual(capture['route'], 'calculate')
+        self.assertTrue(capture_id.endswith(capture['input_hash']))
+        # Captures are keyed by plan ID; the first request already stored this plan.
+        self.assertEqual(capture['input_hash'], response.get_json()['plan_id'])
+        self.assertTrue(capture['cache_hit'])
+
+        inputs = load_replay_inputs(sidecar)
+        self.assertEqual(inputs.current_age, 18)
+        self.assertEqual(len(inputs.payouts), 81)
+
+        output = os.path.join(self.tmpdir.name, 'replay.prof')
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            self.assertEqual(main(['replay', sidecar, '--repeat', '2', '--output', output]), 0)
+        self.assertIn('calculate_year_by_year_projection', stdout.getvalue())
+        self.assertTrue(os.path.exists(output))
+
+    def test_sampling_rate_profiles_chat_requests(self):
+        app.config['PROFILING_ENABLED'] = True
+        app.config['PROFILE_SAMPLE_RATE'] = 1.0
+        response = self.client.post('/api/chat', json={'message': ''})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('chat-no-inputs', response.headers['X-Profile-Id'])
+
+    def test_store_miss_is_recorded_in_sidecar(self):
+        app.config['PROFILING_ENABLED'] = True
+        response = self.client.post('/api/calculate', json=self.payload, headers={'X-Profile-Request': '1'})
+
+        sidecar = os.path.join(app.config['PROFILE_DIR'], f"{response.headers['X-Profile-Id']}.json")
+        with open(sidecar) as handle:
+            self.assertFalse(json.load(handle)['cache_hit'])
+
+
+if __name__ == '__main__':
+    unittest.main()
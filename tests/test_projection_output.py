@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from app import app
+from calculations import calculate_retirement_plan
+from models import RetirementInputs
+from projection_output import ProjectionOptions, lttb_indices, shape_plan
+
+
+def make_inputs(**overrides):
+    payload = {
+        'ideal_retirement_income': 5000,
+        'ideal_retirement_age': 65,
+        'withdrawal_rate': 4,
+        'current_age': 40,
+        'current_asset_values': 200000,
+        'cagr': 5,
+        'monthly_savings': 1500,
+        'payouts': [{'amount': 80000, 'year': 72}],
+    }
+    payload.update(overrides)
+    return RetirementInputs.from_dict(payload)
+
+
+class ProjectionOutputTests(unittest.TestCase):
+    def test_include_ages_keeps_kpis_and_selected_rows(self):
+        full = calculate_retirement_plan(make_inputs())
+        partial = calculate_retirement_plan(make_inputs(), include_ages=frozenset({50, 90}))
+        kpi_only = calculate_retirement_plan(make_inputs(), include_ages=frozenset())
+
+        self.assertEqual([row['age'] for row in partial['year_by_year']], [50, 90])
+        self.assertEqual(partial['year_by_year'][1], full['year_by_year'][50])
+        self.assertEqual(kpi_only['year_by_year'], [])
+        for result in (partial, kpi_only):
+            for key, value in full.items():
+                if key != 'year_by_year':
+                    self.assertEqual(result[key], value, key)
+
+    def test_window_and_stride_keep_end_and_retirement_ages(self):
+        options = ProjectionOptions(min_age=45, max_age=80, stride=10)
+        self.assertEqual(sorted(options.include_ages(40, 65)), [45, 55, 65, 75, 80])
+        self.assertEqual(ProjectionOptions(fields=['gap']).include_ages(40, 65), frozenset())
+        self.assertIsNone(ProjectionOptions(max_points=10).include_ages(40, 65))
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        xs = list(range(61))
+        ys = [100.0 if x == 30 else 0.0 for x in xs]
+        indices = lttb_indices(xs, ys, 7)
+
+        self.assertEqual(len(indices), 7)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 60)
+        self.assertEqual(indices, sorted(indices))
+        self.assertIn(30, indices)
+        self.assertEqual(lttb_indices(xs, ys, 100), xs)
+
+    def test_shape_plan_selects_fields(self):
+        plan = calculate_retirement_plan(make_inputs())
+        plan['plan_id'] = 'abc'
+        shaped = shape_plan(plan, ProjectionOptions(fields=['gap', 'year_by_year'], max_points=12))
+
+        self.assertEqual(set(shaped), {'gap', 'year_by_year', 'plan_id'})
+        self.assertEqual(len(shaped['year_by_year']), 12)
+        self.assertEqual(shaped['year_by_year'][-1]['age'], 100)
+
+    def test_invalid_options_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ProjectionOptions.from_request({'stride': 0})
+        with self.assertRaises(ValueError):
+            ProjectionOptions.from_request({'min_age': 80, 'max_age': 60})
+        self.assertEqual(
+            ProjectionOptions.from_request({'fields': 'gap, depletion_age'}).fields,
+            frozenset({'gap', 'depletion_age'}),
+        )
+
+
+class ProjectionOutputApiTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.previous_path = app.config['PLAN_STORE_PATH']
+        app.config['PLAN_STORE_PATH'] = os.path.join(self.tmpdir.name, 'plans.sqlite3')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app.config['PLAN_STORE_PATH'] = self.previous_path
+        self.tmpdir.cleanup()
+
+    def test_kpi_only_and_windowed_requests(self):
+        payload = {**make_inputs().to_dict(), 'fields': ['gap', 'target_net_worth']}
+        kpis = self.client.post('/api/calculate', json=payload).get_json()
+        self.assertEqual(set(kpis), {'gap', 'target_net_worth', 'plan_id', 'currency'})
+
+        windowed = self.client.get(f"/api/plans/{kpis['plan_id']}?min_age=60&max_age=70").get_json()
+        self.assertEqual([row['age'] for row in windowed['year_by_year']], list(range(60, 71)))
+        self.assertAlmostEqual(windowed['gap'], kpis['gap'])
+
+        response = self.client.get(f"/api/plans/{kpis['plan_id']}?stride=abc")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()